@@ -0,0 +1,114 @@
+"""
+Bulk loading for seed data and imports
+
+Rows are given as lists of column dicts and written through Core, one
+executemany per table (per set of columns, when rows leave out different
+ones to get their defaults). SQLAlchemy batches them into multi-row INSERTs, and
+where the database can return keys from those (PostgreSQL, SQLite 3.35+)
+the new ids come back in the same round trip. Everything runs on the
+session's connection, so it commits or rolls back with the session, and the
+written tables are marked for cache invalidation.
+
+ORM events do not fire for these inserts. `insert_posts` does their work
+itself: slugs, published dates, derived metadata, tags, the search index and
+related posts.
+
+    ids = insert_posts([{'title': ..., 'content': ..., 'author_id': 1,
+                         'tags': ['Python', 'Flask']}])
+"""
+from datetime import datetime
+from models import db, Post, Tag, post_tags, slugify
+from cache import mark_changed
+from content import derive_post_metadata
+from search import index_posts
+from related import mark_posts_changed
+
+
+def _table(target):
+    return getattr(target, '__table__', target)
+
+
+def insert_rows(target, rows, key=None):
+    """Insert `rows` into a model's table or a Table, one executemany per set of columns.
+
+    With `key`, the name of a unique column, returns {row[key]: new primary key}.
+    """
+    table = _table(target)
+    if not rows:
+        return {} if key else None
+    mark_changed(db.session, table.name)
+    # An executemany needs every row to have the same columns
+    batches = {}
+    for row in rows:
+        batches.setdefault(frozenset(row), []).append(row)
+    statement = table.insert()
+    if key is None:
+        for batch in batches.values():
+            db.session.execute(statement, batch)
+        return None
+
+    primary_key = table.primary_key.columns.values()[0]
+    ids = {}
+    for batch in batches.values():
+        if db.session.connection().dialect.insert_executemany_returning:
+            # Matched on `key` rather than row order, which keeps the batch in one statement
+            ids.update(db.session.execute(statement.returning(table.c[key], primary_key), batch).all())
+        else:
+            # Without RETURNING for executemany, one statement per row
+            ids.update((row[key], db.session.execute(statement, row).inserted_primary_key[0]) for row in batch)
+    return ids
+
+
+def resolve_tags(names, create=True):
+    """{name: tag id} for tag `names`, found in one query and created in one insert"""
+    names = list(dict.fromkeys(name for name in names if name))
+    if not names:
+        return {}
+    slugs = {slugify(name): name for name in names}
+    found = {}
+    for tag_id, name, slug in db.session.execute(
+        db.select(Tag.id, Tag.name, Tag.slug).where(db.or_(Tag.slug.in_(slugs), Tag.name.in_(names)))
+    ):
+        found[slugs.get(slug, name)] = tag_id
+    missing = [name for name in names if name not in found]
+    if missing and create:
+        ids = insert_rows(Tag, [{'name': name, 'slug': slugify(name)} for name in missing], key='name')
+        found.update(ids)
+    return found
+
+
+def insert_posts(rows):
+    """Insert posts, each a dict of Post columns plus an optional 'tags' list of names.
+
+    Returns the new post ids in the order of `rows`.
+    """
+    if not rows:
+        return []
+    rows = [dict(row) for row in rows]
+    tag_names = [row.pop('tags', None) or [] for row in rows]
+    now = datetime.utcnow()
+    for row in rows:
+        # As generate_post_slug and set_post_published_date do for ORM inserts
+        if not row.get('slug'):
+            row['slug'] = slugify(row['title'])
+        if row.get('status') == 'published' and not row.get('published_date'):
+            row['published_date'] = row.get('created_date') or now
+        for column, value in derive_post_metadata(row.get('content') or '', row.get('excerpt')).items():
+            row.setdefault(column, value)
+
+    slugs = insert_rows(Post, rows, key='slug')
+    ids = [slugs[row['slug']] for row in rows]
+
+    tag_ids = resolve_tags(name for names in tag_names for name in names)
+    insert_rows(post_tags, [
+        {'post_id': post_id, 'tag_id': tag_ids[name]}
+        for post_id, names in zip(ids, tag_names)
+        for name in dict.fromkeys(names) if name in tag_ids
+    ])
+
+    index_posts(db.session.connection(), [
+        {'post_id': post_id, 'title': row.get('title'), 'excerpt': row.get('excerpt'), 'content': row.get('content')}
+        for post_id, row in zip(ids, rows)
+    ])
+    mark_posts_changed(db.session, ids)
+    return ids
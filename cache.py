@@ -0,0 +1,212 @@
+"""
+In-process caches invalidated from database commits
+
+Each Cache names the tables it is derived from. Committing a session that
+inserted, updated or deleted rows in one of those tables clears the cache.
+Other worker processes notice the change through per-table stamp files in
+the instance folder and clear their own copies. The stamps double as table
+versions for HTTP validators (see conditional.py).
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy import event, inspect
+from models import db
+
+_MISSING = object()
+
+# Every Cache registers itself here so invalidation can reach it
+_caches = []
+
+
+class Cache:
+    """A named in-process cache that is cleared when any of its tables change"""
+
+    def __init__(self, name, tables, max_entries=None):
+        self.name = name
+        self.tables = frozenset(tables)
+        self.max_entries = max_entries
+        self._data = {}
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            if self.max_entries and key not in self._data and len(self._data) >= self.max_entries:
+                # Evict the oldest entry
+                self._data.pop(next(iter(self._data)), None)
+            self._data[key] = value
+        return value
+
+    def get_or_set(self, key, creator):
+        """Return the cached value for `key`, computing and storing it on a miss
+
+        The value is not stored if one of the cache's tables changed while it
+        was computed, since it may have been read before the change.
+        """
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            version = table_version(*self.tables)
+            value = creator()
+            if table_version(*self.tables) == version:
+                self.set(key, value)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f'<Cache {self.name} ({len(self)} entries)>'
+
+
+class _Stamps:
+    """Cross-process invalidation markers, one file per table in the instance folder"""
+    path = None
+    interval = 1.0
+    checked_at = 0.0
+    # Table name -> token of its last change; ALL_TABLES marks a full invalidation
+    versions = {}
+
+
+ALL_TABLES = '_all'
+
+
+def _read_stamps():
+    versions = {}
+    try:
+        entries = list(os.scandir(_Stamps.path))
+    except (OSError, TypeError):
+        return versions
+    for entry in entries:
+        if entry.name.endswith('.tmp'):
+            continue
+        try:
+            with open(entry.path) as f:
+                versions[entry.name] = f.read()
+        except OSError:
+            pass
+    return versions
+
+
+def _touch_stamps(tables):
+    # time_ns first so last_changed() can read the time back; the pid keeps tokens unique
+    token = f'{time.time_ns()}.{os.getpid()}'
+    for table in tables:
+        _Stamps.versions[table] = token
+        if not _Stamps.path:
+            continue
+        path = os.path.join(_Stamps.path, table)
+        try:
+            # Written aside and renamed so readers never see a partial token
+            with open(f'{path}.{os.getpid()}.tmp', 'w') as f:
+                f.write(token)
+            os.replace(f'{path}.{os.getpid()}.tmp', path)
+        except OSError as e:
+            print(f"Could not update cache stamp: {e}")
+
+
+def sync():
+    """Clear caches whose tables another process changed since the last check"""
+    now = time.monotonic()
+    if now - _Stamps.checked_at < _Stamps.interval:
+        return
+    _Stamps.checked_at = now
+    current = _read_stamps()
+    changed = {table for table in current.keys() | _Stamps.versions.keys()
+               if current.get(table) != _Stamps.versions.get(table)}
+    _Stamps.versions = current
+    if changed:
+        for cache in _caches:
+            if ALL_TABLES in changed or cache.tables & changed:
+                cache.clear()
+
+
+def invalidate(*tables):
+    """Clear caches derived from any of `tables` (all caches when none given)"""
+    tables = set(tables)
+    for cache in _caches:
+        if not tables or cache.tables & tables:
+            cache.clear()
+    _touch_stamps(tables or {ALL_TABLES})
+
+
+def table_version(*tables):
+    """Opaque value that changes whenever any of `tables` is written"""
+    return tuple(_Stamps.versions.get(table) for table in sorted(tables) + [ALL_TABLES])
+
+
+def last_changed(*tables):
+    """Time of the last recorded write to any of `tables` (any table when none given), or None"""
+    tokens = [token for token in (table_version(*tables) if tables else _Stamps.versions.values()) if token]
+    if not tokens:
+        return None
+    return datetime.fromtimestamp(max(int(token.split('.')[0]) for token in tokens) / 1e9, timezone.utc)
+
+
+def stream_and_store(cache, key, chunks):
+    """Yield `chunks`, then store them joined under `key` unless the cache's tables changed meanwhile"""
+    version = table_version(*cache.tables)
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    if table_version(*cache.tables) == version:
+        cache.set(key, ''.join(parts))
+
+
+def mark_changed(session, *tables):
+    """Record tables changed outside the unit of work (bulk UPDATE/DELETE)"""
+    session.info.setdefault('changed_tables', set()).update(tables)
+
+
+def _changed_tables(session):
+    """Tables touched by the pending objects in a flush"""
+    tables = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        state = inspect(obj)
+        tables.add(state.mapper.local_table.name)
+        for rel in state.mapper.relationships:
+            if rel.secondary is not None and state.attrs[rel.key].history.has_changes():
+                tables.add(rel.secondary.name)
+    return tables
+
+
+def _after_flush(session, flush_context):
+    mark_changed(session, *_changed_tables(session))
+
+
+def _after_commit(session):
+    tables = session.info.pop('changed_tables', None)
+    if tables:
+        invalidate(*tables)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('changed_tables', None)
+
+
+def init_cache(app):
+    """Hook cache invalidation into the session and cross-worker sync into requests"""
+    _Stamps.path = os.path.join(app.instance_path, 'cache-stamps')
+    _Stamps.interval = app.config.get('CACHE_SYNC_INTERVAL', 1.0)
+    os.makedirs(_Stamps.path, exist_ok=True)
+    _Stamps.versions = _read_stamps()
+
+    event.listen(db.session, 'after_flush', _after_flush)
+    event.listen(db.session, 'after_commit', _after_commit)
+    event.listen(db.session, 'after_soft_rollback', _after_soft_rollback)
+
+    app.before_request(sync)
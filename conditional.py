@@ -0,0 +1,90 @@
+"""
+Conditional GET for public pages
+
+A page's ETag is derived from the URL, the versions of the tables it is
+rendered from (see cache.table_version) and the release of the code and
+templates. Last-Modified is the later of the newest table change and the
+release. Requests whose If-None-Match or If-Modified-Since still match get a
+304 before the view runs. Signed-in users and responses carrying flashed
+messages are always rendered in full.
+"""
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import wraps
+from flask import request, session, make_response
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+from cache import table_version, last_changed
+
+
+class _Release:
+    """Identifies the deployed code and templates"""
+    version = None
+    modified = None
+
+
+def _release_files(app):
+    for name in os.listdir(app.root_path):
+        if name.endswith('.py'):
+            yield os.path.join(app.root_path, name)
+    for folder, _, names in os.walk(os.path.join(app.root_path, app.template_folder)):
+        for name in names:
+            yield os.path.join(folder, name)
+
+
+def init_conditional(app):
+    """Fingerprint the release so deploys change every ETag"""
+    mtimes = sorted((path, os.stat(path).st_mtime_ns) for path in _release_files(app))
+    _Release.version = hashlib.sha1(repr(mtimes).encode()).hexdigest()
+    _Release.modified = datetime.fromtimestamp(max(m for _, m in mtimes) / 1e9, timezone.utc)
+
+
+def release_version():
+    """Fingerprint of the deployed code and templates"""
+    return _Release.version
+
+
+def _validated():
+    """Whether this request may be answered from validators"""
+    return (request.method in ('GET', 'HEAD')
+            and not current_user.is_authenticated
+            and not session.get('_flashes'))
+
+
+def conditional(tables, max_age=0, on_not_modified=None, content_version=None):
+    """Validate a view by the tables it reads and set Cache-Control: public, max-age.
+
+    `on_not_modified` is called with the view arguments when a 304 is sent,
+    for side effects the view would otherwise have had (view counting).
+    `content_version` returns (version, modified) for content the view reads
+    from outside the database (the topic files).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _validated():
+                return view(*args, **kwargs)
+
+            versions = table_version(*tables)
+            content, content_modified = content_version() if content_version else (None, None)
+            etag = hashlib.sha1(repr((request.full_path, _Release.version, versions, content)).encode()).hexdigest()
+            last_modified = max(filter(None, (last_changed(*tables), _Release.modified, content_modified)),
+                                default=None)
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                if on_not_modified is not None:
+                    on_not_modified(**kwargs)
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            return response
+        return wrapper
+    return decorator
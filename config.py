@@ -10,6 +10,40 @@ class Config:
     SECRET_KEY = config('SECRET_KEY', default='dev-secret-key-change-in-production')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection pool per worker process (see engine.py); keep
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) under the database's connection limit
+    DB_POOL_SIZE = config('DB_POOL_SIZE', default=5, cast=int)
+    DB_MAX_OVERFLOW = config('DB_MAX_OVERFLOW', default=10, cast=int)
+    DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=30, cast=int)
+    DB_POOL_RECYCLE = config('DB_POOL_RECYCLE', default=1800, cast=int)
+    DB_POOL_PRE_PING = config('DB_POOL_PRE_PING', default=True, cast=bool)
+    # Set when connecting through pgbouncer in transaction pooling mode
+    DB_PGBOUNCER = config('DB_PGBOUNCER', default=False, cast=bool)
+    
+    # Applied to every SQLite connection, in order (see sqlite_tuning.py)
+    SQLITE_PRAGMAS = {
+        'busy_timeout': 5000,       # milliseconds to wait for a lock before "database is locked"
+        'journal_mode': 'WAL',      # readers are not blocked by a writer
+        'synchronous': 'NORMAL',    # fsync at checkpoints rather than every commit
+        'cache_size': -16000,       # 16 MB page cache per connection
+        'mmap_size': 134217728,     # read the first 128 MB through memory-mapped I/O
+        'temp_store': 'MEMORY',
+    }
+    # Seconds between WAL checkpoints and PRAGMA optimize (0 disables the thread)
+    SQLITE_MAINTENANCE_INTERVAL = config('SQLITE_MAINTENANCE_INTERVAL', default=3600, cast=int)
+    
+    # Per-request query counts and timing (see query_timing.py); off by default in production
+    QUERY_TIMING_ENABLED = config('QUERY_TIMING_ENABLED', default=True, cast=bool)
+    # Log a likely N+1 when one statement shape runs more than this many times in a request
+    QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=5, cast=int)
+    
+    # Read replicas for public pages (see routing.py), comma separated
+    DATABASE_REPLICA_URLS = [url.strip().replace('postgres://', 'postgresql://', 1)
+                             for url in config('DATABASE_REPLICA_URLS', default='').split(',') if url.strip()]
+    READ_REPLICA_ENDPOINTS = ['index', 'resume', 'blog_*', 'topic_detail']
+    # Seconds reads stay on the primary after a write; keep above replica lag
+    READ_YOUR_WRITES_WINDOW = config('READ_YOUR_WRITES_WINDOW', default=5, cast=float)
+    
     # File upload settings
     MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100MB max file size
     UPLOAD_FOLDER = basedir / 'static' / 'uploads'
@@ -24,6 +58,36 @@ class Config:
     # Pagination
     POSTS_PER_PAGE = 6
     
+    # Seconds between checks for cache invalidations made by other workers
+    CACHE_SYNC_INTERVAL = 1.0
+    
+    # Maximum number of rendered blog posts kept in memory per worker
+    POST_PAGE_CACHE_SIZE = 500
+    
+    # Seconds between batched writes of buffered page views
+    VIEW_FLUSH_INTERVAL = 10
+    
+    # Background publishing of scheduled posts and related-post updates; set
+    # SCHEDULER_ENABLED=False when running `flask publish-scheduled` and
+    # `flask related-update` from cron instead
+    SCHEDULER_ENABLED = config('SCHEDULER_ENABLED', default=True, cast=bool)
+    SCHEDULER_POLL_INTERVAL = 60
+    
+    # Neighbours precomputed per post for "Related Posts"
+    RELATED_POSTS_STORED = 6
+    
+    # RSS/Atom feeds: title, number of posts and how long clients may reuse them
+    FEED_TITLE = 'Portfolio & Blog'
+    FEED_LENGTH = 20
+    FEED_MAX_AGE = 900
+    
+    # Language for code blocks without a language-* class (None leaves them plain)
+    HIGHLIGHT_DEFAULT_LANGUAGE = config('HIGHLIGHT_DEFAULT_LANGUAGE', default='') or None
+    
+    # Output folder and worker processes for `flask freeze`
+    FREEZER_DESTINATION = basedir / 'build'
+    FREEZER_WORKERS = config('FREEZER_WORKERS', default=4, cast=int)
+    
     # Razorpay Payment Settings
     RAZORPAY_KEY_ID = config('RAZORPAY_KEY_ID', default='')
     RAZORPAY_KEY_SECRET = config('RAZORPAY_KEY_SECRET', default='')
@@ -33,11 +97,16 @@ class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = f"sqlite:///{basedir / 'instance' / 'site.db'}"
+    # A local file needs no liveness check
+    DB_POOL_PRE_PING = config('DB_POOL_PRE_PING', default=False, cast=bool)
 
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
+    # Render's Postgres closes connections idle for a while; recycle well before that
+    DB_POOL_RECYCLE = config('DB_POOL_RECYCLE', default=300, cast=int)
+    QUERY_TIMING_ENABLED = config('QUERY_TIMING_ENABLED', default=False, cast=bool)
     # Handle both PostgreSQL (from Render) and SQLite fallback
     database_url = os.getenv('DATABASE_URL', '')
     if database_url:
@@ -45,7 +114,7 @@ class ProductionConfig(Config):
         # Render provides postgres:// but SQLAlchemy needs postgresql://
         if database_url.startswith('postgres://'):
             SQLALCHEMY_DATABASE_URI = database_url.replace('postgres://', 'postgresql://', 1)
-        elif database_url.startswith('postgresql://'):
+        elif database_url.startswith(('postgresql://', 'postgresql+')):
             SQLALCHEMY_DATABASE_URI = database_url
         else:
             # Fallback to SQLite if URL format is unexpected
@@ -55,9 +124,21 @@ class ProductionConfig(Config):
         SQLALCHEMY_DATABASE_URI = f"sqlite:///{basedir / 'instance' / 'site.db'}"
 
 
+class TestingConfig(Config):
+    """Configuration for the tests in tests/"""
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    # Resolved against the instance folder; point INSTANCE_PATH at a scratch directory
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///test.db'
+    DB_POOL_PRE_PING = False
+    SCHEDULER_ENABLED = False
+    SQLITE_MAINTENANCE_INTERVAL = 0
+
+
 config_dict = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
 
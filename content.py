@@ -0,0 +1,104 @@
+"""
+Derived post metadata
+
+Word count, reading time, a plain-text excerpt, a default meta description
+and the body with highlighted code blocks are computed from a post's HTML
+when it is saved and stored in columns, so templates never re-tokenize the
+content. The columns are added to older databases by migrations 0003 and
+0004, and `flask backfill-post-metadata` recomputes them for every post.
+"""
+from sqlalchemy import event, inspect
+from models import db, Post
+from cache import invalidate
+from highlight import highlight_html
+from utils import strip_html
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 300
+META_DESCRIPTION_LENGTH = 160
+
+# Derived columns and their DDL types, for databases created before they existed (migration 0003)
+DERIVED_COLUMNS = {
+    'word_count': 'INTEGER',
+    'reading_time': 'INTEGER',
+    'plain_excerpt': 'VARCHAR(500)',
+    'default_meta_description': 'VARCHAR(160)',
+    'content_html': 'TEXT',
+}
+
+# Fields the derived metadata is computed from
+SOURCE_FIELDS = ('content', 'excerpt')
+
+
+def truncate_words(text, length):
+    """Cut `text` to at most `length` characters at a word boundary"""
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1].rsplit(' ', 1)[0].rstrip(' ,.;:')
+    return cut + '…'
+
+
+def derive_post_metadata(content, excerpt=None):
+    """Metadata for a post body, keyed by column name"""
+    plain_content = strip_html(content)
+    word_count = len(plain_content.split())
+    plain_excerpt = truncate_words(strip_html(excerpt) or plain_content, EXCERPT_LENGTH)
+    return {
+        'word_count': word_count,
+        'reading_time': max(1, round(word_count / WORDS_PER_MINUTE)),
+        'plain_excerpt': plain_excerpt,
+        'default_meta_description': truncate_words(plain_excerpt, META_DESCRIPTION_LENGTH),
+        'content_html': highlight_html(content),
+    }
+
+
+@event.listens_for(Post, 'before_insert')
+@event.listens_for(Post, 'before_update')
+def set_post_metadata(mapper, connection, target):
+    state = inspect(target)
+    if target.word_count is not None and target.content_html is not None and not any(
+        state.attrs[name].history.has_changes() for name in SOURCE_FIELDS
+    ):
+        return
+    for column, value in derive_post_metadata(target.content or '', target.excerpt).items():
+        setattr(target, column, value)
+
+
+def update_post_metadata(connection, rows):
+    """Store derived metadata for `rows` of (id, content, excerpt)"""
+    posts = Post.__table__
+    # Core UPDATE that skips the ORM events and keeps updated_date as it was
+    update = posts.update().where(posts.c.id == db.bindparam('post_id')).values(
+        updated_date=posts.c.updated_date,
+        **{column: db.bindparam(f'new_{column}') for column in DERIVED_COLUMNS}
+    )
+    connection.execute(update, [
+        {'post_id': row.id, **{f'new_{column}': value for column, value in
+                               derive_post_metadata(row.content or '', row.excerpt).items()}}
+        for row in rows
+    ])
+
+
+def backfill_post_metadata(connection=None, batch_size=200):
+    """Compute derived metadata for existing posts in batches; returns the number updated"""
+    if connection is None:
+        with db.engine.begin() as connection:
+            return backfill_post_metadata(connection, batch_size)
+
+    posts = Post.__table__
+    total = 0
+    last_id = 0
+    while True:
+        select = (db.select(posts.c.id, posts.c.content, posts.c.excerpt)
+                  .where(posts.c.id > last_id).order_by(posts.c.id).limit(batch_size))
+        batch = connection.execute(select).all()
+        if not batch:
+            break
+        update_post_metadata(connection, batch)
+        total += len(batch)
+        last_id = batch[-1].id
+    if total:
+        # Listings show the plain excerpt and reading time
+        invalidate('posts')
+    return total
+
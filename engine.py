@@ -0,0 +1,124 @@
+"""
+Database engine options and connection pool telemetry
+
+`init_engine(app)` turns the DB_POOL_* settings of the config class into
+SQLALCHEMY_ENGINE_OPTIONS before Flask-SQLAlchemy creates the engine:
+
+- a fixed pool of DB_POOL_SIZE connections per worker process, plus up to
+  DB_MAX_OVERFLOW more under bursts, waiting at most DB_POOL_TIMEOUT
+  seconds for one before failing the request;
+- connections recycled after DB_POOL_RECYCLE seconds and pinged before
+  use, so a connection the server or a proxy closed is replaced instead of
+  failing the query;
+- with DB_PGBOUNCER, settings for pgbouncer in transaction pooling mode:
+  no server-side prepared statements (psycopg 3 makes them; psycopg2 never
+  does) and startup locks held inside one transaction (see startup.py).
+
+Each worker can open DB_POOL_SIZE + DB_MAX_OVERFLOW connections, so size
+`gunicorn -w` so that workers times that stays under the database's
+connection limit. `pool_status()` reports the live numbers for this
+process: connections checked out, overflow in use, and how long checkouts
+waited for a connection.
+"""
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Checkouts waiting longer than this many seconds are logged
+SLOW_CHECKOUT = 1.0
+
+
+class PoolStats:
+    """Checkout counts and wait times for this process's pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+        if timed_out:
+            print(f"Database pool exhausted: no connection after {wait:.1f}s")
+        elif wait > SLOW_CHECKOUT:
+            print(f"Slow database checkout: waited {wait:.1f}s for a connection")
+
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        # Includes opening a new connection when the pool grows
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record(time.perf_counter() - start)
+        return connection
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the database in `config`"""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # An in-memory database lives in one connection; keep SQLAlchemy's pool for it
+        return {}
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    if config['DB_PGBOUNCER'] and url.get_backend_name() == 'postgresql' and url.get_driver_name() == 'psycopg':
+        # pgbouncer hands each transaction to any server connection, where a
+        # statement prepared on another one does not exist
+        options['connect_args'] = {'prepare_threshold': None}
+    return options
+
+
+def init_engine(app):
+    """Set the engine options from the config; call before db.init_app"""
+    options = engine_options(app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def pool_status(engine):
+    """Live pool numbers for this process"""
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            # Connections open beyond `size`; negative while the pool is still filling
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    with pool_stats._lock:
+        status.update(
+            checkouts=pool_stats.checkouts,
+            timeouts=pool_stats.timeouts,
+            wait_avg_ms=round(1000 * pool_stats.wait_total / max(pool_stats.checkouts + pool_stats.timeouts, 1), 3),
+            wait_max_ms=round(1000 * pool_stats.wait_max, 3),
+        )
+    return status
@@ -0,0 +1,172 @@
+"""
+RSS and Atom feeds of published posts
+
+Feeds are written element by element with an XMLGenerator and streamed to
+the client as each post is serialized. The posts are loaded before the
+response is returned, so the stream holds no database connection. A
+completed document is kept in memory until a post, tag or category is
+written; the key includes the client-supplied host, so at most MAX_CACHED
+documents are kept. Responses carry an ETag and
+a Last-Modified taken from the newest published/updated date in the feed,
+and a matching conditional request gets a 304 without touching the feed.
+"""
+import hashlib
+from email.utils import format_datetime
+from datetime import timezone
+from xml.sax.saxutils import XMLGenerator
+from flask import Response, current_app, request, stream_with_context, url_for
+from werkzeug.http import is_resource_modified
+from models import db, Post
+from cache import Cache, table_version, stream_and_store
+from conditional import release_version
+from loading import FEED_ITEM
+from utils import ChunkBuffer, xml_element
+
+FEED_TABLES = ('posts', 'post_tags', 'tags', 'categories')
+
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+CONTENT_NS = 'http://purl.org/rss/1.0/modules/content/'
+
+MIMETYPES = {'rss': 'application/rss+xml', 'atom': 'application/atom+xml'}
+
+# Cached entries: a document and its validators count as two
+MAX_CACHED = 200
+
+# Finished documents and their validators, keyed by (format, category id, tag id, host)
+_feeds = Cache('feeds', tables=FEED_TABLES, max_entries=MAX_CACHED)
+
+
+def _utc(value):
+    return value.replace(tzinfo=timezone.utc)
+
+
+def _feed_query(category=None, tag=None):
+    query = Post.query.filter_by(status='published')
+    if category:
+        query = query.filter_by(category_id=category.id)
+    if tag:
+        query = query.filter(Post.tags.contains(tag))
+    return query
+
+
+def _stats(query):
+    """(newest published_date, newest updated_date, post count) of a feed's posts"""
+    return query.with_entities(
+        db.func.max(Post.published_date), db.func.max(Post.updated_date), db.func.count(Post.id)
+    ).order_by(None).one()
+
+
+def _write_rss(xml, buffer, posts, title, link, self_url):
+    xml.startElement('rss', {'version': '2.0', 'xmlns:atom': ATOM_NS, 'xmlns:content': CONTENT_NS})
+    xml.startElement('channel', {})
+    xml_element(xml, 'title', title)
+    xml_element(xml, 'link', link)
+    xml_element(xml, 'description', title)
+    xml_element(xml, 'atom:link', attrs={'href': self_url, 'rel': 'self', 'type': MIMETYPES['rss']})
+    yield buffer.take()
+    for post in posts:
+        url = url_for('blog_detail', slug=post.slug, _external=True)
+        xml.startElement('item', {})
+        xml_element(xml, 'title', post.title)
+        xml_element(xml, 'link', url)
+        xml_element(xml, 'guid', url, {'isPermaLink': 'true'})
+        if post.published_date:
+            xml_element(xml, 'pubDate', format_datetime(_utc(post.published_date)))
+        if post.category:
+            xml_element(xml, 'category', post.category.name)
+        for tag in post.tags:
+            xml_element(xml, 'category', tag.name)
+        xml_element(xml, 'description', post.plain_excerpt)
+        xml_element(xml, 'content:encoded', post.content)
+        xml.endElement('item')
+        yield buffer.take()
+    xml.endElement('channel')
+    xml.endElement('rss')
+
+
+def _write_atom(xml, buffer, posts, title, link, self_url, updated):
+    xml.startElement('feed', {'xmlns': ATOM_NS})
+    xml_element(xml, 'title', title)
+    xml_element(xml, 'id', self_url)
+    xml_element(xml, 'link', attrs={'href': link})
+    xml_element(xml, 'link', attrs={'href': self_url, 'rel': 'self', 'type': MIMETYPES['atom']})
+    if updated:
+        xml_element(xml, 'updated', _utc(updated).isoformat())
+    yield buffer.take()
+    for post in posts:
+        url = url_for('blog_detail', slug=post.slug, _external=True)
+        xml.startElement('entry', {})
+        xml_element(xml, 'title', post.title)
+        xml_element(xml, 'id', url)
+        xml_element(xml, 'link', attrs={'href': url})
+        if post.published_date:
+            xml_element(xml, 'published', _utc(post.published_date).isoformat())
+        xml_element(xml, 'updated', _utc(post.updated_date or post.published_date).isoformat())
+        if post.author:
+            xml.startElement('author', {})
+            xml_element(xml, 'name', post.author.username)
+            xml.endElement('author')
+        if post.category:
+            xml_element(xml, 'category', attrs={'term': post.category.name})
+        for tag in post.tags:
+            xml_element(xml, 'category', attrs={'term': tag.name})
+        xml_element(xml, 'summary', post.plain_excerpt)
+        xml_element(xml, 'content', post.content, {'type': 'html'})
+        xml.endElement('entry')
+        yield buffer.take()
+    xml.endElement('feed')
+
+
+def _feed_posts(query):
+    return query.options(*FEED_ITEM).order_by(Post.published_date.desc(), Post.id.desc()) \
+        .limit(current_app.config['FEED_LENGTH']).all()
+
+
+def _generate(kind, posts, title, link, self_url, updated):
+    buffer = ChunkBuffer()
+    xml = XMLGenerator(buffer, encoding='utf-8', short_empty_elements=True)
+    xml.startDocument()
+    if kind == 'rss':
+        yield from _write_rss(xml, buffer, posts, title, link, self_url)
+    else:
+        yield from _write_atom(xml, buffer, posts, title, link, self_url, updated)
+    xml.endDocument()
+    yield buffer.take()
+
+
+def feed_response(kind, category=None, tag=None):
+    """RSS ('rss') or Atom ('atom') response for all posts or one category or tag"""
+    # Links are absolute, so the host is part of the key
+    key = (kind, category.id if category else None, tag.id if tag else None, request.host_url)
+    version = table_version(*FEED_TABLES)
+    query = _feed_query(category, tag)
+
+    published, updated, count = _feeds.get_or_set(key + ('stats',), lambda: tuple(_stats(query)))
+    newest = max(filter(None, (published, updated)), default=None)
+    last_modified = _utc(newest) if newest else None
+    etag = hashlib.sha1(repr((key, published, updated, count, version, release_version())).encode()).hexdigest()
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        document = _feeds.get(key)
+        if document is None:
+            title = current_app.config['FEED_TITLE']
+            if category or tag:
+                title = f"{title} - {(category or tag).name}"
+            if category:
+                link = url_for('blog_category', slug=category.slug, _external=True)
+            elif tag:
+                link = url_for('blog_tag', slug=tag.slug, _external=True)
+            else:
+                link = url_for('blog_list', _external=True)
+            document = stream_with_context(stream_and_store(
+                _feeds, key, _generate(kind, _feed_posts(query), title, link, request.base_url, last_modified)
+            ))
+        response = Response(document, mimetype=MIMETYPES[kind])
+
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['FEED_MAX_AGE']
+    return response
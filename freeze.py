@@ -0,0 +1,325 @@
+"""
+Static export of the public site
+
+`flask freeze` renders every public page through the app into a folder of
+HTML files and copies the static files and uploads beside them, so the site
+can be served by any static file server. Paginated listings become
+/blog/page/N/, and links between pages are rewritten to match.
+
+The build records each page's dependencies (the posts, tags and categories
+shown on it, its listing slice, the sidebar, the portfolio tables, the topic
+file) with their versions in a manifest. The next build re-renders only the
+pages whose dependencies changed. Editing one post re-renders that post, the
+listing, tag and category pages that show it, and the posts linking to it
+as related or previous. Changes to the code or templates rebuild
+everything. Rendering is spread over a pool of worker processes.
+
+The contact form and blog search need the server and are not exported.
+"""
+import hashlib
+import html
+import json
+import math
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from flask import current_app
+from models import (db, Post, Tag, Category, RelatedPost, Profile, Education, Experience,
+                    Skill, Project, Achievement, post_tags)
+from conditional import release_version
+from pagination import decode_cursor
+from taxonomy import get_taxonomy
+from topics import topics
+
+MANIFEST = 'freeze-manifest.json'
+
+# Pages rendered per task sent to a worker
+CHUNK_SIZE = 20
+
+# Non-HTML pages and the file each is written to
+FILE_PAGES = {'/download-resume': 'download-resume.pdf'}
+
+PORTFOLIO_MODELS = (Profile, Education, Experience, Skill, Project, Achievement)
+
+HREF = re.compile(r'(href|src)="(/[^"]*)"')
+
+
+def _digest(value):
+    return hashlib.sha1(repr(value).encode()).hexdigest()
+
+
+# ==================== URLS AND PATHS ====================
+
+def static_url(url):
+    """Where a link to `url` points in the exported site"""
+    parts = urlsplit(url)
+    if parts.path in FILE_PAGES:
+        return '/' + FILE_PAGES[parts.path]
+    query = parse_qs(parts.query)
+    if not query.keys() & {'page', 'after', 'before', 'prev'}:
+        return url
+
+    page = 1
+    for key in ('after', 'before'):
+        position = decode_cursor(query[key][0]) if key in query else None
+        if position:
+            page = position[2]
+    if 'page' in query and query['page'][0].isdigit():
+        page = int(query['page'][0])
+    path = parts.path.rstrip('/')
+    return f'{path}/page/{page}/' if page > 1 else f'{path}/'
+
+
+def output_path(url):
+    """File a page is written to, relative to the output folder"""
+    url = static_url(url)
+    if url.startswith('/') and url.lstrip('/') in FILE_PAGES.values():
+        return url.lstrip('/')
+    path = urlsplit(url).path.strip('/')
+    return os.path.join(path, 'index.html') if path else 'index.html'
+
+
+def _rewrite_links(page):
+    """Point internal links at the exported files"""
+    def replace(match):
+        url = html.unescape(match.group(2))
+        return f'{match.group(1)}="{html.escape(static_url(url))}"'
+
+    return HREF.sub(replace, page)
+
+
+# ==================== DEPENDENCIES ====================
+
+def _versions():
+    """Current version of everything a page can depend on, keyed like 'post:12'"""
+    versions = {}
+    posts = (db.session.query(Post.id, Post.slug, Post.updated_date, Post.category_id, Post.previous_post_id)
+             .filter(Post.status == 'published')
+             .order_by(Post.published_date.desc(), Post.id.desc())
+             .all())
+    published = {post.id for post in posts}
+    for post in posts:
+        versions[f'post:{post.id}'] = post.updated_date.isoformat() if post.updated_date else ''
+    for tag in Tag.query.all():
+        versions[f'tag:{tag.id}'] = f'{tag.name}|{tag.slug}'
+    for category in Category.query.all():
+        versions[f'category:{category.id}'] = f'{category.name}|{category.slug}'
+
+    tags_by_post = {}
+    for post_id, tag_id in db.session.query(post_tags.c.post_id, post_tags.c.tag_id):
+        if post_id in published:
+            tags_by_post.setdefault(post_id, []).append(tag_id)
+
+    related = {}
+    for row in RelatedPost.query.order_by(RelatedPost.post_id, RelatedPost.rank):
+        if row.related_post_id in published:
+            related.setdefault(row.post_id, []).append(row.related_post_id)
+
+    for topic in topics.all():
+        versions[f'topic:{topic.slug}'] = topic.modified.isoformat()
+    versions['taxonomy'] = _digest(get_taxonomy())
+    versions['portfolio'] = _digest([
+        [[getattr(row, column.key) for column in model.__table__.columns] for row in model.query.order_by(model.id)]
+        for model in PORTFOLIO_MODELS
+    ])
+    return versions, posts, tags_by_post, related
+
+
+def plan_pages():
+    """{url: dependencies} for every page of the site, dependencies as {key: version}"""
+    versions, posts, tags_by_post, related = _versions()
+    per_page = current_app.config['POSTS_PER_PAGE']
+    pages = {}
+
+    def depend(url, keys):
+        pages[url] = {key: versions.get(key) for key in keys}
+
+    def card_keys(post):
+        return [f'post:{post.id}', f'category:{post.category_id}'] + [f'tag:{t}' for t in tags_by_post.get(post.id, [])]
+
+    depend('/', ['portfolio'])
+    depend('/resume', ['portfolio'])
+    for url in FILE_PAGES:
+        depend(url, [])
+
+    listings = {'/blog': ([], posts)}
+    for category in Category.query.all():
+        listings[f'/blog/category/{category.slug}'] = (
+            [f'category:{category.id}'], [p for p in posts if p.category_id == category.id])
+    for tag in Tag.query.all():
+        listings[f'/blog/tag/{tag.slug}'] = (
+            [f'tag:{tag.id}'], [p for p in posts if tag.id in tags_by_post.get(p.id, [])])
+
+    for base, (keys, listed) in listings.items():
+        count = max(1, math.ceil(len(listed) / per_page))
+        for number in range(1, count + 1):
+            shown = listed[(number - 1) * per_page:number * per_page]
+            key = f'listing:{base}:{number}'
+            versions[key] = f'{[p.id for p in shown]}|{count}'
+            depend(base if number == 1 else f'{base}?page={number}',
+                   keys + ['taxonomy', key] + [k for p in shown for k in card_keys(p)])
+
+    by_category = {}
+    for post in posts:
+        by_category.setdefault(post.category_id, []).append(post.id)
+    for post in posts:
+        # Same-category fallback mirrors get_related_posts()
+        neighbours = related.get(post.id) or [
+            other for other in by_category.get(post.category_id, []) if other != post.id
+        ]
+        versions[f'related:{post.id}'] = str(neighbours[:3])
+        keys = card_keys(post) + [f'related:{post.id}'] + [f'post:{other}' for other in neighbours[:3]]
+        if post.previous_post_id:
+            keys.append(f'post:{post.previous_post_id}')
+        depend(f'/blog/{post.slug}', keys)
+
+    # Topic pages link back to the Python Learning post when it is published
+    learning = [f'post:{post.id}' for post in posts if post.slug == 'python-learning']
+    for topic in topics.all():
+        depend(f'/blog/topic/{topic.slug}', [f'topic:{topic.slug}'] + learning)
+    return pages
+
+
+# ==================== RENDERING ====================
+
+_worker_app = None
+
+
+def _init_worker():
+    """Per-process setup: fresh database connections and no view counting"""
+    global _worker_app
+    from app import app
+    from view_counter import view_counter
+    with app.app_context():
+        db.engine.dispose(close=False)
+    view_counter.counting = False
+    _worker_app = app
+
+
+def _render(urls, output):
+    """Render `urls` into `output`; returns [(url, status)]"""
+    results = []
+    client = _worker_app.test_client()
+    for url in urls:
+        response = client.get(url)
+        if response.status_code != 200:
+            results.append((url, response.status_code))
+            continue
+        path = os.path.join(output, output_path(url))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if response.mimetype == 'text/html':
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(_rewrite_links(response.get_data(as_text=True)))
+        else:
+            with open(path, 'wb') as f:
+                f.write(response.get_data())
+        results.append((url, 200))
+    return results
+
+
+def _copy_tree(source, destination):
+    """Copy new or changed files; returns how many were copied"""
+    copied = 0
+    for folder, _, names in os.walk(source):
+        target_folder = os.path.join(destination, os.path.relpath(folder, source))
+        os.makedirs(target_folder, exist_ok=True)
+        for name in names:
+            src, dst = os.path.join(folder, name), os.path.join(target_folder, name)
+            stat = os.stat(src)
+            if os.path.exists(dst):
+                existing = os.stat(dst)
+                if existing.st_size == stat.st_size and existing.st_mtime_ns >= stat.st_mtime_ns:
+                    continue
+            shutil.copy2(src, dst)
+            copied += 1
+    return copied
+
+
+def _copy_files(app, output):
+    copied = _copy_tree(app.static_folder, os.path.join(output, 'static'))
+    for file_type, folder in (('images', 'UPLOAD_IMAGE_FOLDER'), ('videos', 'UPLOAD_VIDEO_FOLDER'),
+                              ('resumes', 'UPLOAD_RESUME_FOLDER')):
+        copied += _copy_tree(str(app.config[folder]), os.path.join(output, 'uploads', file_type))
+    # /uploads/images/ falls back to static/images (see uploaded_file)
+    images = os.path.join(output, 'uploads', 'images')
+    for name in os.listdir(os.path.join(app.static_folder, 'images')):
+        if not os.path.exists(os.path.join(images, name)):
+            shutil.copy2(os.path.join(app.static_folder, 'images', name), images)
+            copied += 1
+    return copied
+
+
+def _remove_page(output, url):
+    path = os.path.join(output, output_path(url))
+    if os.path.exists(path):
+        os.remove(path)
+    folder = os.path.dirname(path)
+    while folder != output and os.path.isdir(folder) and not os.listdir(folder):
+        os.rmdir(folder)
+        folder = os.path.dirname(folder)
+
+
+def freeze_site(output=None, workers=None, full=False):
+    """Export the public site into `output`; returns (rendered, unchanged, removed)"""
+    app = current_app._get_current_object()
+    output = os.path.abspath(output or app.config['FREEZER_DESTINATION'])
+    workers = workers or app.config['FREEZER_WORKERS']
+    os.makedirs(output, exist_ok=True)
+
+    manifest_path = os.path.join(output, MANIFEST)
+    previous = {}
+    if not full and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f)
+    if previous.get('release') != release_version():
+        previous = {}
+    old_pages = previous.get('pages', {})
+
+    pages = plan_pages()
+
+    def stale(url, deps):
+        old = old_pages.get(url)
+        return (url in FILE_PAGES or old is None or old['deps'] != deps
+                or not os.path.exists(os.path.join(output, output_path(url))))
+
+    todo = [url for url, deps in pages.items() if stale(url, deps)]
+    results = {}
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 1 else None
+    if pool is None:
+        _init_worker()
+    try:
+        chunks = [todo[i:i + CHUNK_SIZE] for i in range(0, len(todo), CHUNK_SIZE)]
+        if pool:
+            batches = pool.map(_render, chunks, [output] * len(chunks))
+        else:
+            batches = (_render(chunk, output) for chunk in chunks)
+        for batch in batches:
+            results.update(batch)
+    finally:
+        if pool:
+            pool.shutdown()
+        else:
+            from view_counter import view_counter
+            view_counter.counting = True
+
+    manifest = {'release': release_version(), 'pages': {}}
+    for url, deps in pages.items():
+        if results.get(url, 200) != 200:
+            print(f"Skipped {url}: HTTP {results[url]}")
+            continue
+        manifest['pages'][url] = {'deps': deps}
+
+    removed = [url for url in old_pages if url not in manifest['pages']]
+    for url in removed:
+        _remove_page(output, url)
+
+    copied = _copy_files(app, output)
+    if copied:
+        print(f"Copied {copied} static and uploaded files")
+
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    rendered = sum(1 for status in results.values() if status == 200)
+    return rendered, len(manifest['pages']) - rendered, len(removed)
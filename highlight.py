@@ -0,0 +1,176 @@
+"""
+Server-side syntax highlighting
+
+`highlight_html()` turns each <pre><code class="language-X"> block of a post
+or topic body into Pygments token spans, coloured by the "Syntax
+highlighting" rules in main.css, so readers need no highlighting script.
+Blocks without a language use HIGHLIGHT_DEFAULT_LANGUAGE, and are left
+plain when it is unset.
+Highlighted blocks are cached by a hash of their language and source, in
+memory and as files in the instance folder, so a block is tokenized once
+per edit and the work survives restarts. Reading a file refreshes its
+modification time, and the least recently used files beyond MAX_FILES are
+deleted at startup and as new blocks are saved. Post bodies are highlighted when
+saved and stored in posts.content_html (see content.py).
+"""
+import hashlib
+import html
+import os
+import re
+import threading
+import time
+import pygments
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+# Class added to highlighted <code> elements; blocks carrying it are left alone
+HIGHLIGHTED = 'highlight'
+
+# Highlighted blocks kept in memory
+MAX_ENTRIES = 2000
+
+# Highlighted blocks kept in the instance folder, and new files saved between prunes
+MAX_FILES = 10000
+PRUNE_EVERY = 100
+
+CODE_BLOCK = re.compile(r'<pre(?P<pre>[^>]*)>\s*<code(?P<attrs>[^>]*)>(?P<source>.*?)</code>\s*</pre>', re.S)
+CLASS_ATTR = re.compile(r'\s*class="([^"]*)"')
+LANGUAGE_CLASS = re.compile(r'^language-([\w+#.-]+)$')
+
+_formatter = HtmlFormatter(nowrap=True)
+
+
+class _BlockCache:
+    """Highlighted blocks by content hash, in memory and on disk"""
+    folder = None
+    default_language = None
+    entries = {}
+    saved = 0
+    lock = threading.Lock()
+
+
+def init_highlight(app):
+    """Keep highlighted blocks in the instance folder"""
+    _BlockCache.folder = os.path.join(app.instance_path, 'highlight-cache')
+    _BlockCache.default_language = app.config['HIGHLIGHT_DEFAULT_LANGUAGE']
+    os.makedirs(_BlockCache.folder, exist_ok=True)
+    prune_cache()
+
+
+def prune_cache(max_files=MAX_FILES):
+    """Delete the least recently used cached blocks beyond `max_files`; returns how many"""
+    if _BlockCache.folder is None:
+        return 0
+    files = []
+    for entry in os.scandir(_BlockCache.folder):
+        if entry.name.endswith('.tmp'):
+            continue
+        try:
+            files.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            pass
+    if len(files) <= max_files:
+        return 0
+    files.sort()
+    removed = 0
+    for _, path in files[:len(files) - max_files]:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _block_key(language, source):
+    # The Pygments version is part of the key so upgrades re-tokenize
+    return hashlib.sha1(f'{pygments.__version__}\0{language}\0{source}'.encode()).hexdigest()
+
+
+def _load(key):
+    if _BlockCache.folder is None:
+        return None
+    path = os.path.join(_BlockCache.folder, key)
+    try:
+        with open(path, encoding='utf-8') as f:
+            tokens = f.read()
+        # Marks the block as recently used for prune_cache
+        os.utime(path, (time.time(), time.time()))
+    except OSError:
+        return None
+    return tokens
+
+
+def _remember(key, tokens):
+    with _BlockCache.lock:
+        if len(_BlockCache.entries) >= MAX_ENTRIES:
+            _BlockCache.entries.pop(next(iter(_BlockCache.entries)), None)
+        _BlockCache.entries[key] = tokens
+
+
+def _save(key, tokens):
+    if _BlockCache.folder is None:
+        return
+    path = os.path.join(_BlockCache.folder, key)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(tokens)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Could not store highlighted block: {e}")
+        return
+    with _BlockCache.lock:
+        _BlockCache.saved += 1
+        due = _BlockCache.saved % PRUNE_EVERY == 0
+    if due:
+        prune_cache()
+
+
+def highlight_block(language, source):
+    """Token spans for `source` (plain text), or None for an unknown language"""
+    key = _block_key(language, source)
+    tokens = _BlockCache.entries.get(key)
+    if tokens is None:
+        tokens = _load(key)
+        if tokens is None:
+            try:
+                lexer = get_lexer_by_name(language)
+            except ClassNotFound:
+                return None
+            tokens = highlight(source, lexer, _formatter)
+            # Pygments ends the output with a newline the source may not have
+            if not source.endswith('\n'):
+                tokens = tokens.removesuffix('\n')
+            _save(key, tokens)
+        _remember(key, tokens)
+    return tokens
+
+
+def highlight_html(content):
+    """`content` with its language-tagged code blocks highlighted"""
+    if not content or '<pre' not in content:
+        return content
+
+    def replace(match):
+        attrs = match.group('attrs')
+        class_attr = CLASS_ATTR.search(attrs)
+        classes = class_attr.group(1).split() if class_attr else []
+        if HIGHLIGHTED in classes:
+            return match.group(0)
+        languages = [m.group(1) for m in map(LANGUAGE_CLASS.match, classes) if m]
+        language = languages[0].lower() if languages else _BlockCache.default_language
+        if not language:
+            return match.group(0)
+        tokens = highlight_block(language, html.unescape(match.group('source')))
+        if tokens is None:
+            return match.group(0)
+        if not languages:
+            classes.append(f'language-{language}')
+        attrs = CLASS_ATTR.sub('', attrs)
+        return (f'<pre{match.group("pre")}><code class="{" ".join(classes + [HIGHLIGHTED])}"{attrs}>'
+                f'{tokens}</code></pre>')
+
+    return CODE_BLOCK.sub(replace, content)
@@ -0,0 +1,59 @@
+"""
+Loader profiles for Post queries
+
+Each view applies the profile that matches what its template reads, so
+relationships are fetched in a fixed number of queries per page instead of
+one per row, and large columns a view never shows are left unloaded.
+
+    Post.query.options(*POST_CARD).filter_by(status='published')
+"""
+from sqlalchemy.orm import configure_mappers, defer, joinedload, load_only, selectinload
+from models import Post
+
+# Backrefs such as Post.category only exist once the mappers are configured
+configure_mappers()
+
+# Blog listing cards: category and tags, but not the post body
+POST_CARD = (
+    joinedload(Post.category),
+    selectinload(Post.tags),
+    defer(Post.content),
+    defer(Post.content_html),
+    defer(Post.excerpt),
+)
+
+# Full post page: category and tags alongside the highlighted body
+POST_DETAIL = (
+    joinedload(Post.category),
+    selectinload(Post.tags),
+    defer(Post.content),
+)
+
+# Feed entries: full body, category, tags and author
+FEED_ITEM = (
+    joinedload(Post.category),
+    joinedload(Post.author),
+    selectinload(Post.tags),
+    defer(Post.content_html),
+)
+
+# "Related posts" cards: title, image and plain excerpt only
+RELATED_CARD = (
+    defer(Post.content),
+    defer(Post.content_html),
+    defer(Post.excerpt),
+)
+
+# Admin post table: category and view counter per row
+ADMIN_ROW = (
+    joinedload(Post.category),
+    joinedload(Post.view_count),
+    defer(Post.content),
+    defer(Post.content_html),
+    defer(Post.excerpt),
+)
+
+# Select-field choices such as "previous post"
+POST_CHOICE = (
+    load_only(Post.id, Post.title),
+)
@@ -0,0 +1,413 @@
+"""
+Versioned schema migrations
+
+Each migration is a function registered with `@migration(version,
+description)`, with an optional down step registered by `@reverts(version)`.
+It runs once per database, and applied versions are recorded in the
+schema_migrations table. Pending migrations run right after
+`db.create_all()`, so new and existing databases end up with the same schema;
+`migrate()` does both and also runs the online migrations.
+`flask db-upgrade` runs them on demand and `flask db-downgrade VERSION`
+reverts those newer than VERSION. The statements work on both SQLite and
+PostgreSQL.
+
+A migration runs in one transaction unless it is registered with
+`online=True`. Online migrations get a connection that commits as it goes,
+so they can work on a live site without holding long locks:
+
+- `create_index(..., concurrently=True)` builds the index with CREATE INDEX
+  CONCURRENTLY on PostgreSQL, which does not block writes (0002 uses it);
+- `backfill()` updates a table in primary key order, committing each batch
+  with a checkpoint, so an interrupted backfill resumes where it stopped.
+
+Online migrations are skipped inside create_all's transaction, while the
+others still run there; `upgrade()` runs them on its own connections.
+
+`check_indexes()` runs EXPLAIN on the queries behind the busiest routes and
+reports any that scan a whole table or sort outside an index.
+"""
+import re
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import event, inspect, text
+from models import db, Post, Tag, RelatedPost, CourseSubscription
+from loading import POST_CARD, POST_DETAIL, RELATED_CARD, ADMIN_ROW
+from content import DERIVED_COLUMNS, update_post_metadata
+from cache import invalidate
+
+Migration = namedtuple('Migration', 'version description apply revert online')
+
+# Registered migrations, kept in version order
+MIGRATIONS = []
+
+schema_migrations = db.Table('schema_migrations',
+    db.Column('version', db.String(32), primary_key=True),
+    db.Column('description', db.String(200), nullable=False),
+    db.Column('applied_at', db.DateTime, nullable=False)
+)
+
+# Progress of unfinished backfills: the last primary key done
+migration_checkpoints = db.Table('migration_checkpoints',
+    db.Column('name', db.String(100), primary_key=True),
+    db.Column('position', db.Integer, nullable=False),
+    db.Column('rows_done', db.Integer, nullable=False),
+    db.Column('updated_at', db.DateTime, nullable=False)
+)
+
+# Rows updated per backfill transaction
+BACKFILL_BATCH_SIZE = 500
+
+
+def migration(version, description, online=False):
+    """Register a function taking a connection as a schema migration"""
+    def register(apply):
+        MIGRATIONS.append(Migration(version, description, apply, None, online))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return apply
+    return register
+
+
+def reverts(version):
+    """Register a function taking a connection as the down step of migration `version`"""
+    def register(revert):
+        index = next(i for i, m in enumerate(MIGRATIONS) if m.version == version)
+        MIGRATIONS[index] = MIGRATIONS[index]._replace(revert=revert)
+        return revert
+    return register
+
+
+def _concurrently(connection):
+    """Whether index DDL can use CONCURRENTLY on this connection"""
+    return connection.dialect.name == 'postgresql'
+
+
+def _run_outside_transaction(connection, sql):
+    # CONCURRENTLY refuses to run in a transaction block, and must not wait on
+    # locks this migration's own connection still holds
+    connection.commit()
+    with connection.engine.connect() as ddl:
+        ddl.execution_options(isolation_level='AUTOCOMMIT')
+        ddl.execute(text(sql))
+
+
+def create_index(connection, name, table, columns, where=None, unique=False, concurrently=False):
+    """CREATE INDEX IF NOT EXISTS, optionally partial
+
+    `concurrently` builds the index without blocking writes on PostgreSQL; it
+    is only for online migrations.
+    """
+    concurrently = concurrently and _concurrently(connection)
+    sql = (f"CREATE {'UNIQUE ' if unique else ''}INDEX {'CONCURRENTLY ' if concurrently else ''}"
+           f"IF NOT EXISTS {name} ON {table} ({columns})")
+    if where:
+        sql += f' WHERE {where}'
+    if not concurrently:
+        connection.execute(text(sql))
+        return
+    # An interrupted concurrent build leaves an invalid index that IF NOT EXISTS would keep
+    invalid = connection.execute(text(
+        'SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)'
+    ), {'name': name}).scalar()
+    if invalid:
+        print(f"Rebuilding invalid index {name}")
+        _run_outside_transaction(connection, f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    _run_outside_transaction(connection, sql)
+
+
+def drop_index(connection, name, concurrently=False):
+    """DROP INDEX IF EXISTS, without blocking writes on PostgreSQL if `concurrently`"""
+    if concurrently and _concurrently(connection):
+        _run_outside_transaction(connection, f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    else:
+        connection.execute(text(f'DROP INDEX IF EXISTS {name}'))
+
+
+def backfill(connection, name, table, columns, update_batch, where=None, batch_size=BACKFILL_BATCH_SIZE):
+    """Call `update_batch(connection, rows)` over `table` in primary key order; returns the rows done
+
+    Rows hold the primary key and `columns`, `batch_size` at a time, limited
+    by `where`. Each batch commits with a checkpoint named `name`, so the work
+    is spread over short transactions and a rerun after an interruption
+    resumes after the last committed batch. Only for online migrations.
+    """
+    key = table.primary_key.columns.values()[0]
+    migration_checkpoints.create(connection, checkfirst=True)
+    checkpoint = migration_checkpoints.c
+    saved = connection.execute(
+        db.select(checkpoint.position, checkpoint.rows_done).where(checkpoint.name == name)
+    ).first()
+    position, done = saved if saved else (None, 0)
+    if saved:
+        print(f"Resuming {name} after {key.name} {position} ({done} rows done)")
+
+    while True:
+        select = db.select(key, *columns).order_by(key).limit(batch_size)
+        if position is not None:
+            select = select.where(key > position)
+        if where is not None:
+            select = select.where(where)
+        rows = connection.execute(select).all()
+        if not rows:
+            break
+        update_batch(connection, rows)
+        position = rows[-1][0]
+        done += len(rows)
+        connection.execute(migration_checkpoints.delete().where(checkpoint.name == name))
+        connection.execute(migration_checkpoints.insert().values(
+            name=name, position=position, rows_done=done, updated_at=datetime.utcnow()
+        ))
+        connection.commit()
+        print(f"{name}: {done} rows done (through {key.name} {position})")
+
+    connection.execute(migration_checkpoints.delete().where(checkpoint.name == name))
+    connection.commit()
+    return done
+
+
+def _columns(connection, table):
+    return {column['name'] for column in inspect(connection).get_columns(table)}
+
+
+# ==================== MIGRATIONS ====================
+
+@migration('0001', 'Add posts.previous_post_id for continuation posts')
+def add_previous_post_id(connection):
+    if 'previous_post_id' not in _columns(connection, 'posts'):
+        connection.execute(text('ALTER TABLE posts ADD COLUMN previous_post_id INTEGER REFERENCES posts (id)'))
+
+
+HOT_QUERY_INDEXES = ('ix_posts_published', 'ix_posts_category_published', 'ix_posts_status_published_date',
+                     'ix_posts_created_date', 'ix_post_tags_tag_id', 'ix_course_subscriptions_lookup')
+
+
+@migration('0002', 'Indexes for listing, tag, scheduler, admin and subscription queries', online=True)
+def add_hot_query_indexes(connection):
+    # Blog listings page newest first by (published_date, id) over published posts only
+    create_index(connection, 'ix_posts_published', 'posts',
+                 'published_date DESC, id DESC', where="status = 'published'", concurrently=True)
+    create_index(connection, 'ix_posts_category_published', 'posts',
+                 'category_id, published_date DESC, id DESC', where="status = 'published'", concurrently=True)
+    # Admin status filters and the scheduler's due-post lookup
+    create_index(connection, 'ix_posts_status_published_date', 'posts', 'status, published_date',
+                 concurrently=True)
+    # Default admin sort
+    create_index(connection, 'ix_posts_created_date', 'posts', 'created_date', concurrently=True)
+    # The primary key is (post_id, tag_id); tag pages look up by tag
+    create_index(connection, 'ix_post_tags_tag_id', 'post_tags', 'tag_id, post_id', concurrently=True)
+    create_index(connection, 'ix_course_subscriptions_lookup', 'course_subscriptions',
+                 'course_id, email, status', concurrently=True)
+
+
+@reverts('0002')
+def drop_hot_query_indexes(connection):
+    for name in HOT_QUERY_INDEXES:
+        drop_index(connection, name, concurrently=True)
+
+
+@migration('0003', 'Add derived post metadata columns')
+def add_derived_columns(connection):
+    # Nullable columns without defaults: no table rewrite on either database
+    existing = _columns(connection, 'posts')
+    for name, ddl_type in DERIVED_COLUMNS.items():
+        if name not in existing:
+            connection.execute(text(f'ALTER TABLE posts ADD COLUMN {name} {ddl_type}'))
+
+
+@reverts('0003')
+def drop_derived_columns(connection):
+    existing = _columns(connection, 'posts')
+    for name in DERIVED_COLUMNS:
+        if name in existing:
+            connection.execute(text(f'ALTER TABLE posts DROP COLUMN {name}'))
+
+
+@migration('0004', 'Backfill derived post metadata', online=True)
+def backfill_derived_columns(connection):
+    posts = Post.__table__
+    done = backfill(connection, '0004-post-metadata', posts, [posts.c.content, posts.c.excerpt],
+                    update_post_metadata,
+                    where=db.or_(*(posts.c[column].is_(None) for column in DERIVED_COLUMNS)))
+    if done:
+        # Listings show the plain excerpt and reading time
+        invalidate('posts')
+
+
+@reverts('0004')
+def keep_derived_metadata(connection):
+    # Data only: the values are dropped with the columns by 0003's down step
+    pass
+
+
+# ==================== RUNNER ====================
+
+def applied_versions(connection):
+    schema_migrations.create(connection, checkfirst=True)
+    return set(connection.execute(db.select(schema_migrations.c.version)).scalars())
+
+
+def _apply(connection, m):
+    m.apply(connection)
+    connection.execute(schema_migrations.insert().values(
+        version=m.version, description=m.description, applied_at=datetime.utcnow()
+    ))
+    print(f"Applied migration {m.version}: {m.description}")
+
+
+def _revert(connection, m):
+    m.revert(connection)
+    connection.execute(schema_migrations.delete().where(schema_migrations.c.version == m.version))
+    print(f"Reverted migration {m.version}: {m.description}")
+
+
+def _run(step, m):
+    """Run `step` for migration `m` on a fresh connection, in one transaction unless it is online"""
+    with db.engine.connect() as connection:
+        if m.online:
+            step(connection, m)
+            connection.commit()
+        else:
+            with connection.begin():
+                step(connection, m)
+
+
+def upgrade(connection=None):
+    """Apply pending migrations in order; returns the versions applied
+
+    Given a connection, as inside create_all, applies them in its transaction
+    and skips the online ones, which must not run inside it.
+    """
+    if connection is not None:
+        done = applied_versions(connection)
+        applied = []
+        for m in MIGRATIONS:
+            if m.version in done or m.online:
+                continue
+            _apply(connection, m)
+            applied.append(m.version)
+        return applied
+
+    with db.engine.begin() as connection:
+        done = applied_versions(connection)
+    pending = [m for m in MIGRATIONS if m.version not in done]
+    for m in pending:
+        _run(_apply, m)
+    return [m.version for m in pending]
+
+
+def migrate():
+    """Create missing tables and apply every pending migration; returns the versions applied"""
+    before = {version for version, _, applied_at in migration_status() if applied_at}
+    db.create_all()
+    upgrade()
+    return [version for version, _, applied_at in migration_status()
+            if applied_at and version not in before]
+
+
+def downgrade(target):
+    """Revert applied migrations newer than `target`, newest first; returns the versions reverted
+
+    `target` is a known version, with or without its leading zeros, or 0 to
+    revert them all.
+    """
+    target = str(target).strip()
+    if target.isdigit():
+        target = target.zfill(4)
+    if target != '0000' and target not in {m.version for m in MIGRATIONS}:
+        raise ValueError(f"Unknown migration version {target}")
+
+    with db.engine.begin() as connection:
+        done = applied_versions(connection)
+    newer = [m for m in reversed(MIGRATIONS) if m.version in done and m.version > target]
+    # Refuse up front rather than stop halfway
+    irreversible = [m.version for m in newer if m.revert is None]
+    if irreversible:
+        raise ValueError(f"Migration {irreversible[0]} has no down step")
+    reverted = []
+    for m in newer:
+        try:
+            _run(_revert, m)
+        except Exception as e:
+            raise ValueError(f"Reverting migration {m.version} failed after {len(reverted)} "
+                             f"migration(s) were reverted: {e}") from e
+        reverted.append(m.version)
+    return reverted
+
+
+def migration_status(connection=None):
+    """(version, description, applied_at or None) for every known migration"""
+    if connection is None:
+        with db.engine.connect() as connection:
+            return migration_status(connection)
+
+    if not inspect(connection).has_table('schema_migrations'):
+        return [(m.version, m.description, None) for m in MIGRATIONS]
+    applied = dict(connection.execute(
+        db.select(schema_migrations.c.version, schema_migrations.c.applied_at)
+    ).all())
+    return [(m.version, m.description, applied.get(m.version)) for m in MIGRATIONS]
+
+
+@event.listens_for(db.metadata, 'after_create')
+def apply_migrations(target, connection, **kw):
+    """Bring the schema up to date whenever the tables are created or verified"""
+    upgrade(connection)
+
+
+# ==================== INDEX CHECK ====================
+
+def _hot_queries():
+    """The statements behind the busiest routes, with representative values"""
+    now = datetime.utcnow()
+    newest_first = (Post.published_date.desc(), Post.id.desc())
+    published = db.select(Post).options(*POST_CARD).where(Post.status == 'published')
+    return {
+        'blog listing': published.order_by(*newest_first).limit(11),
+        'blog listing, next page': published.where(
+            db.tuple_(Post.published_date, Post.id) < (now, 1000)
+        ).order_by(*newest_first).limit(11),
+        'category listing': published.where(Post.category_id == 1).order_by(*newest_first).limit(11),
+        'tag listing': published.where(Post.tags.contains(Tag(id=1))).order_by(*newest_first).limit(11),
+        'post detail': db.select(Post).options(*POST_DETAIL).where(
+            Post.slug == 'example', Post.status == 'published'
+        ),
+        'related posts': db.select(Post).options(*RELATED_CARD)
+            .join(RelatedPost, RelatedPost.related_post_id == Post.id)
+            .where(RelatedPost.post_id == 1, Post.status == 'published')
+            .order_by(RelatedPost.rank).limit(3),
+        'scheduled posts due': db.select(Post.id).where(
+            Post.status == 'scheduled', Post.published_date <= now
+        ),
+        'admin posts': db.select(Post).options(*ADMIN_ROW).order_by(Post.created_date.desc()).limit(20),
+        'subscription check': db.select(CourseSubscription).where(
+            CourseSubscription.course_id == 1,
+            CourseSubscription.email == 'reader@example.com',
+            CourseSubscription.status == 'completed'
+        ).limit(1),
+    }
+
+
+def _explain(connection, statement):
+    """Query plan lines and the problems found in them"""
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    if connection.dialect.name == 'sqlite':
+        plan = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+        problems = [f'full scan of {match.group(1)}' for line in plan
+                    for match in [re.match(r'SCAN (\w+)$', line)] if match]
+        problems += ['sorts outside an index' for line in plan if 'TEMP B-TREE FOR ORDER BY' in line]
+    else:
+        # Tables are often too small for the planner to prefer an index on its own
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        plan = [row[0] for row in connection.exec_driver_sql(f'EXPLAIN {sql}')]
+        problems = [f'full scan of {match.group(1)}' for line in plan
+                    for match in [re.search(r'Seq Scan on (\w+)', line)] if match]
+        problems += ['sorts outside an index' for line in plan if re.match(r'\s*(->\s*)?Sort\b', line)]
+    return plan, problems
+
+
+def check_indexes():
+    """EXPLAIN each hot query; returns {name: (plan lines, problems)}"""
+    results = {}
+    for name, statement in _hot_queries().items():
+        with db.engine.connect() as connection, connection.begin():
+            results[name] = _explain(connection, statement)
+    return results
@@ -4,8 +4,9 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from sqlalchemy import event
 import re
+from routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 class User(UserMixin, db.Model):
@@ -232,27 +233,82 @@ class Post(db.Model):
     published_date = db.Column(db.DateTime)
     created_date = db.Column(db.DateTime, default=datetime.utcnow)
     updated_date = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    views_count = db.Column(db.Integer, default=0)
+    views_count = db.Column(db.Integer, default=0)  # Legacy; live counts are kept in post_view_counts
     meta_description = db.Column(db.String(160))
     meta_keywords = db.Column(db.String(255))
     previous_post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), nullable=True)  # For continuation posts
     
-    # Many-to-many relationship with Tag
-    tags = db.relationship('Tag', secondary=post_tags, lazy='subquery', backref=db.backref('posts', lazy=True))
+    # Derived from content and excerpt on save (see content.py)
+    word_count = db.Column(db.Integer)
+    reading_time = db.Column(db.Integer)
+    plain_excerpt = db.Column(db.String(500))
+    default_meta_description = db.Column(db.String(160))
+    content_html = db.Column(db.Text)  # Content with code blocks highlighted (see highlight.py)
+    
+    # Many-to-many relationship with Tag; views that show tags eager-load them (see loading.py)
+    tags = db.relationship('Tag', secondary=post_tags, lazy='select', backref=db.backref('posts', lazy=True))
     
     # Relationship to previous post (for continuations)
     previous_post = db.relationship('Post', remote_side=[id], backref='next_posts', foreign_keys=[previous_post_id])
     
+    # View counter, kept in its own table so page views never write to posts
+    view_count = db.relationship('PostViewCount', uselist=False, cascade='all, delete-orphan')
+    
+    def get_views(self):
+        """Views flushed to the database so far"""
+        return self.view_count.views if self.view_count else 0
+    
     def get_reading_time(self):
         """Estimate reading time in minutes"""
+        if self.reading_time:
+            return self.reading_time
         word_count = len(self.content.split())
         reading_time = max(1, round(word_count / 200))  # Average reading speed: 200 words per minute
         return reading_time
     
+    def get_meta_description(self):
+        """Meta description, falling back to one derived from the content"""
+        return self.meta_description or self.default_meta_description or ''
+    
     def __repr__(self):
         return f'<Post {self.title}>'
 
 
+class PostViewCount(db.Model):
+    """Per-post view counter, written in batches by view_counter.py"""
+    __tablename__ = 'post_view_counts'
+    
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    views = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<PostViewCount {self.post_id}: {self.views}>'
+
+
+@event.listens_for(PostViewCount.__table__, 'after_create')
+def copy_legacy_view_counts(target, connection, **kw):
+    """Carry existing posts.views_count values over when the counter table is first created"""
+    connection.execute(
+        target.insert().from_select(
+            ['post_id', 'views'],
+            db.select(Post.__table__.c.id, Post.__table__.c.views_count).where(Post.__table__.c.views_count > 0)
+        )
+    )
+
+
+class RelatedPost(db.Model):
+    """Precomputed related-post neighbours, maintained by related.py"""
+    __tablename__ = 'related_posts'
+    
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    related_post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    
+    def __repr__(self):
+        return f'<RelatedPost {self.post_id} #{self.rank}: {self.related_post_id}>'
+
+
 class Course(db.Model):
     """Course model for system design course"""
     __tablename__ = 'courses'
@@ -344,3 +400,11 @@ def generate_post_slug(mapper, connection, target):
     if not target.slug:
         target.slug = slugify(target.title)
 
+
+
+@event.listens_for(Post, 'before_insert')
+@event.listens_for(Post, 'before_update')
+def set_post_published_date(mapper, connection, target):
+    # Listings paginate on (published_date, id), so published posts always carry a date
+    if target.status == 'published' and not target.published_date:
+        target.published_date = target.created_date or datetime.utcnow()
@@ -0,0 +1,104 @@
+"""
+Keyset (seek) pagination for blog listings
+
+Pages are addressed by an opaque cursor that encodes the (published_date, id)
+of the row at the page boundary, so every page is an index range scan with
+no OFFSET and costs the same as the first one.
+"""
+import base64
+import binascii
+import json
+import math
+from datetime import datetime
+from models import db, Post
+
+
+class KeysetPage:
+    """One page of a keyset-paginated listing.
+
+    Exposes the same `items`, `page`, `pages`, `has_prev` and `has_next`
+    attributes templates already use for Flask-SQLAlchemy pagination.
+    """
+
+    def __init__(self, items, page, per_page, total, has_prev, has_next):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.has_prev = has_prev
+        self.has_next = has_next
+
+    @property
+    def pages(self):
+        if not self.total:
+            return 1 if self.items else 0
+        return max(self.page, math.ceil(self.total / self.per_page))
+
+    @property
+    def prev_cursor(self):
+        if self.has_prev and self.items:
+            return encode_cursor(self.items[0], self.page - 1)
+        return None
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.items:
+            return encode_cursor(self.items[-1], self.page + 1)
+        return None
+
+
+def encode_cursor(post, page):
+    """Opaque URL-safe token pointing just past `post`"""
+    key = [post.published_date.isoformat() if post.published_date else None, post.id, page]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (published_date, id, page) from a token, or None if it is malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        published, post_id, page = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(published), int(post_id), max(1, int(page))
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+
+def paginate_keyset(query, per_page, after=None, before=None, page=None, total=None):
+    """Fetch one page of `query` ordered newest first.
+
+    `after` continues past a cursor (next page), `before` walks back from
+    one (previous page). A plain `page` number, as found in old `?page=N`
+    links, is served once by OFFSET; the links it renders are cursors again.
+    With none of these, the first page is returned.
+    """
+    key = db.tuple_(Post.published_date, Post.id)
+    newest_first = (Post.published_date.desc(), Post.id.desc())
+
+    if page and page > 1 and not (after or before):
+        rows = (query.order_by(*newest_first)
+                .offset((page - 1) * per_page).limit(per_page + 1).all())
+        return KeysetPage(rows[:per_page], page, per_page, total,
+                          has_prev=True, has_next=len(rows) > per_page)
+
+    position = decode_cursor(before) if before else None
+    if position:
+        published, post_id, page = position
+        rows = (query.filter(key > (published, post_id))
+                .order_by(Post.published_date.asc(), Post.id.asc())
+                .limit(per_page + 1).all())
+        has_prev = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        return KeysetPage(items, page, per_page, total, has_prev=has_prev, has_next=True)
+
+    position = decode_cursor(after) if after else None
+    if position:
+        published, post_id, page = position
+        query = query.filter(key < (published, post_id))
+        has_prev = True
+    else:
+        page = 1
+        has_prev = False
+
+    rows = query.order_by(*newest_first).limit(per_page + 1).all()
+    return KeysetPage(rows[:per_page], page, per_page, total,
+                      has_prev=has_prev, has_next=len(rows) > per_page)
@@ -1,15 +1,97 @@
 """
 Script to populate portfolio database from resume information
+
+The seed data is split into sections (profile, education, experiences,
+skills, achievements, projects, taxonomy and one per blog post). A digest
+of each section's data is kept in the seed_state table, and sections whose
+digest is unchanged are skipped, so a restart with the same data makes a
+few SELECTs and no writes. A changed section is applied as an upsert
+matched on natural keys that writes only the columns that differ. Rows
+deleted by hand are not recreated until their section changes.
 """
+import hashlib
 import os
 from app import app, db
 from config import config_dict
 from models import (
     User, Profile, Education, Experience, Skill, Project, Achievement,
-    Category, Tag, Post
+    Category, Tag, Post, slugify
 )
 from datetime import datetime, date
 from werkzeug.security import generate_password_hash
+from bulk import insert_rows, insert_posts
+from migrations import migrate
+
+seed_state = db.Table('seed_state',
+    db.Column('section', db.String(200), primary_key=True),
+    db.Column('digest', db.String(64), nullable=False),
+    db.Column('applied_at', db.DateTime, nullable=False)
+)
+
+
+def content_digest(data):
+    """Stable digest of seed data built from literals, dates and containers"""
+    return hashlib.sha256(repr(data).encode()).hexdigest()
+
+
+class SeedState:
+    """Digests of the seed sections already applied to the database"""
+
+    def __init__(self):
+        self.digests = dict(db.session.execute(db.select(seed_state.c.section, seed_state.c.digest)).all())
+        self.pending = {}
+
+    def changed(self, section, data):
+        """Whether `data` differs from what was last applied for `section`"""
+        digest = content_digest(data)
+        if self.digests.get(section) == digest:
+            return False
+        self.pending[section] = digest
+        return True
+
+    def save(self):
+        """Record the pending digests in the current transaction"""
+        now = datetime.utcnow()
+        for section, digest in self.pending.items():
+            if section in self.digests:
+                db.session.execute(seed_state.update().where(seed_state.c.section == section)
+                                   .values(digest=digest, applied_at=now))
+            else:
+                db.session.execute(seed_state.insert().values(section=section, digest=digest, applied_at=now))
+        self.digests.update(self.pending)
+        self.pending = {}
+
+
+def sync_rows(model, profile_id, rows, key):
+    """Make the profile's `model` rows match `rows`, matched on the `key` columns.
+
+    New rows are inserted in one batch, only differing columns of existing
+    rows are written, and rows missing from `rows` are deleted.
+    Returns (added, updated, removed).
+    """
+    existing = {tuple(getattr(row, column) for column in key): row
+                for row in model.query.filter_by(profile_id=profile_id)}
+    new_rows = []
+    updated = 0
+    for values in rows:
+        row = existing.pop(tuple(values[column] for column in key), None)
+        if row is None:
+            new_rows.append({'profile_id': profile_id, **values})
+            continue
+        changes = {column: value for column, value in values.items() if getattr(row, column) != value}
+        for column, value in changes.items():
+            setattr(row, column, value)
+        updated += bool(changes)
+    for row in existing.values():
+        db.session.delete(row)
+    insert_rows(model, new_rows)
+    return len(new_rows), updated, len(existing)
+
+
+def report(section, counts):
+    added, updated, removed = counts
+    print(f"Seeded {section}: {added} added, {updated} updated, {removed} removed")
+
 
 def populate_database():
     # Set production config if needed
@@ -20,8 +102,8 @@ def populate_database():
         app.config.from_object(config_dict['default'])
     
     with app.app_context():
-        # Create tables
-        db.create_all()
+        # Create tables and apply schema migrations
+        migrate()
         
         # Create admin user if not exists
         admin_user = User.query.filter_by(username='admin').first()
@@ -41,46 +123,49 @@ def populate_database():
         # Update admin username to display as "Agrim Sharma" for blog posts
         # We'll use the profile name for author display
         
-        # Create or update profile
-        profile = Profile.query.first()
-        if not profile:
-            profile = Profile()
+        seed = SeedState()
         
-        profile.name = "Agrim Sharma"
-        profile.title = "Software Engineering Manager | Python Specialist | Generative AI Expert | Freelancer"
-        profile.bio = """Accomplished Software Engineering Manager with 14+ years of progressive experience in 
+        # Create or update profile
+        profile_data = {}
+        profile_data['name'] = "Agrim Sharma"
+        profile_data['title'] = "Software Engineering Manager | Python Specialist | Generative AI Expert | Freelancer"
+        profile_data['bio'] = """Accomplished Software Engineering Manager with 14+ years of progressive experience in 
 designing, developing, and deploying scalable software solutions and leading high-performing engineering teams. 
 Expertise in Python development (11+ years), microservices architecture, REST APIs, and emerging technologies 
 including Generative AI, Retrieval-Augmented Generation (RAG), and Large Language Model (LLM) fine-tuning."""
-        profile.email = "agrim89@gmail.com"
-        profile.phone = "8800673006"
-        profile.location = "North Delhi, Delhi, India"
-        profile.linkedin_url = "https://linkedin.com/in/agrim-sharma"
-        profile.github_url = "https://github.com/agrim1989"
-        profile.website_url = "https://agrimsharma.github.io"
+        profile_data['email'] = "agrim89@gmail.com"
+        profile_data['phone'] = "8800673006"
+        profile_data['location'] = "North Delhi, Delhi, India"
+        profile_data['linkedin_url'] = "https://linkedin.com/in/agrim-sharma"
+        profile_data['github_url'] = "https://github.com/agrim1989"
+        profile_data['website_url'] = "https://agrimsharma.github.io"
         # Set profile image to static file (works on Render)
-        profile.profile_image = "1712210182705.jpeg"
+        profile_data['profile_image'] = "1712210182705.jpeg"
         
-        db.session.add(profile)
-        db.session.flush()
-        
-        # Clear existing data
-        Education.query.filter_by(profile_id=profile.id).delete()
-        Experience.query.filter_by(profile_id=profile.id).delete()
-        Skill.query.filter_by(profile_id=profile.id).delete()
-        Project.query.filter_by(profile_id=profile.id).delete()
-        Achievement.query.filter_by(profile_id=profile.id).delete()
+        profile = Profile.query.first()
+        if not profile:
+            profile = Profile()
+            db.session.add(profile)
+        if seed.changed('profile', profile_data) or profile.id is None:
+            for column, value in profile_data.items():
+                if getattr(profile, column) != value:
+                    setattr(profile, column, value)
+            db.session.flush()
+            print(f"Seeded profile: {profile.name}")
         
         # Add Education
-        education = Education(
-            profile_id=profile.id,
-            institution="PDM College of Engineering, India",
-            degree="Bachelor of Engineering (BE) in Computer Science",
-            start_date=date(2006, 8, 1),
-            end_date=date(2010, 3, 1),
-            order=1
-        )
-        db.session.add(education)
+        educations = [
+            {
+                'institution': "PDM College of Engineering, India",
+                'degree': "Bachelor of Engineering (BE) in Computer Science",
+                'start_date': date(2006, 8, 1),
+                'end_date': date(2010, 3, 1),
+                'order': 1
+            }
+        ]
+        
+        if seed.changed('education', educations):
+            report('education', sync_rows(Education, profile.id, educations, ('institution', 'degree')))
         
         # Add Experiences
         experiences = [
@@ -169,18 +254,19 @@ Designed complex MySQL queries for high-performance data retrieval.""",
             }
         ]
         
-        for exp_data in experiences:
-            exp = Experience(
-                profile_id=profile.id,
-                company=exp_data['company'],
-                position=exp_data['position'],
-                start_date=exp_data['start_date'],
-                end_date=exp_data.get('end_date'),
-                current=exp_data.get('current', False),
-                description=exp_data['description'],
-                order=exp_data['order']
-            )
-            db.session.add(exp)
+        if seed.changed('experiences', experiences):
+            report('experiences', sync_rows(Experience, profile.id, [
+                {
+                    'company': exp_data['company'],
+                    'position': exp_data['position'],
+                    'start_date': exp_data['start_date'],
+                    'end_date': exp_data.get('end_date'),
+                    'current': exp_data.get('current', False),
+                    'description': exp_data['description'],
+                    'order': exp_data['order']
+                }
+                for exp_data in experiences
+            ], ('company', 'position')))
         
         # Add Skills
         skills_data = [
@@ -216,15 +302,16 @@ Designed complex MySQL queries for high-performance data retrieval.""",
             {'name': 'Pandas', 'category': 'other', 'proficiency': 85, 'order': 7},
         ]
         
-        for skill_data in skills_data:
-            skill = Skill(
-                profile_id=profile.id,
-                name=skill_data['name'],
-                category=skill_data['category'],
-                proficiency_level=skill_data['proficiency'],
-                order=skill_data['order']
-            )
-            db.session.add(skill)
+        if seed.changed('skills', skills_data):
+            report('skills', sync_rows(Skill, profile.id, [
+                {
+                    'name': skill_data['name'],
+                    'category': skill_data['category'],
+                    'proficiency_level': skill_data['proficiency'],
+                    'order': skill_data['order']
+                }
+                for skill_data in skills_data
+            ], ('name',)))
         
         # Add Professional Certifications
         certifications = [
@@ -260,16 +347,6 @@ Designed complex MySQL queries for high-performance data retrieval.""",
             }
         ]
         
-        for i, cert_data in enumerate(certifications, 1):
-            cert = Achievement(
-                profile_id=profile.id,
-                title=cert_data['title'],
-                description=cert_data.get('description', ''),
-                date=cert_data['date'],
-                issuer=cert_data.get('issuer', ''),
-                order=i
-            )
-            db.session.add(cert)
         
         # Add Key Achievements
         achievements = [
@@ -300,15 +377,27 @@ Designed complex MySQL queries for high-performance data retrieval.""",
             }
         ]
         
-        for i, ach_data in enumerate(achievements, 1):
-            achievement = Achievement(
-                profile_id=profile.id,
-                title=ach_data['title'],
-                description=ach_data.get('description', ''),
-                date=ach_data['date'],
-                order=i + 10  # Separate from certifications
-            )
-            db.session.add(achievement)
+        # Certifications and achievements share the achievements table
+        if seed.changed('achievements', (certifications, achievements)):
+            report('achievements', sync_rows(Achievement, profile.id, [
+                {
+                    'title': cert_data['title'],
+                    'description': cert_data.get('description', ''),
+                    'date': cert_data['date'],
+                    'issuer': cert_data.get('issuer', ''),
+                    'order': i
+                }
+                for i, cert_data in enumerate(certifications, 1)
+            ] + [
+                {
+                    'title': ach_data['title'],
+                    'description': ach_data.get('description', ''),
+                    'date': ach_data['date'],
+                    'issuer': None,
+                    'order': i + 10  # Separate from certifications
+                }
+                for i, ach_data in enumerate(achievements, 1)
+            ], ('title',)))
         
         # Add Projects
         projects = [
@@ -371,51 +460,40 @@ Designed complex MySQL queries for high-performance data retrieval.""",
             }
         ]
         
-        for proj_data in projects:
-            project = Project(
-                profile_id=profile.id,
-                title=proj_data['title'],
-                description=proj_data['description'],
-                technologies=proj_data['technologies'],
-                date=proj_data['date'],
-                featured=proj_data['featured'],
-                order=proj_data['order']
-            )
-            db.session.add(project)
+        if seed.changed('projects', projects):
+            report('projects', sync_rows(Project, profile.id, [
+                {
+                    'title': proj_data['title'],
+                    'description': proj_data['description'],
+                    'technologies': proj_data['technologies'],
+                    'date': proj_data['date'],
+                    'featured': proj_data['featured'],
+                    'order': proj_data['order']
+                }
+                for proj_data in projects
+            ], ('title',)))
         
         # Create Categories and Tags for Blog
-        tech_category = Category.query.filter_by(slug='technology').first()
-        if not tech_category:
-            tech_category = Category(name='Technology', slug='technology', description='Posts about technology and software development')
-            db.session.add(tech_category)
-        
-        ai_category = Category.query.filter_by(slug='ai-ml').first()
-        if not ai_category:
-            ai_category = Category(name='AI & Machine Learning', slug='ai-ml', description='Posts about artificial intelligence and machine learning')
-            db.session.add(ai_category)
-        
-        career_category = Category.query.filter_by(slug='career').first()
-        if not career_category:
-            career_category = Category(name='Career', slug='career', description='Career advice and professional development')
-            db.session.add(career_category)
-        
-        db.session.flush()
+        categories_data = [
+            {'name': 'Technology', 'slug': 'technology', 'description': 'Posts about technology and software development'},
+            {'name': 'AI & Machine Learning', 'slug': 'ai-ml', 'description': 'Posts about artificial intelligence and machine learning'},
+            {'name': 'Career', 'slug': 'career', 'description': 'Career advice and professional development'},
+        ]
         
         # Create Tags
         tags_data = ['Python', 'Django', 'Flask', 'FastAPI', 'AI', 'Machine Learning', 'RAG', 'LLM', 'Software Engineering', 'Leadership', 'Microservices', 'AWS', 'Generative AI', 'API Development', 'Web Development', 'System Design', 'Architecture', 'Design Patterns', 'Data Structures', 'Distributed Systems', 'Caching', 'Interview']
-        tag_objects = {}
-        for tag_name in tags_data:
-            tag = Tag.query.filter_by(slug=tag_name.lower().replace(' ', '-')).first()
-            if not tag:
-                tag = Tag(name=tag_name, slug=tag_name.lower().replace(' ', '-'))
-                db.session.add(tag)
-            tag_objects[tag_name] = tag
         
-        db.session.flush()
+        # Existing categories and tags are kept as they are; missing ones are created
+        if seed.changed('taxonomy', (categories_data, tags_data)):
+            existing = {c.slug for c in Category.query.filter(Category.slug.in_([c['slug'] for c in categories_data]))}
+            existing_tags = {t.slug for t in Tag.query.filter(Tag.slug.in_([slugify(n) for n in tags_data]))}
+            new_categories = [c for c in categories_data if c['slug'] not in existing]
+            new_tags = [{'name': n, 'slug': slugify(n)} for n in tags_data if slugify(n) not in existing_tags]
+            insert_rows(Category, new_categories)
+            insert_rows(Tag, new_tags)
+            report('taxonomy', (len(new_categories) + len(new_tags), 0, 0))
         
         # Create Dummy Blog Posts
-        admin_user = User.query.filter_by(username='admin').first()
-        
         blog_posts = [
             {
                 'title': 'Getting Started with Retrieval-Augmented Generation (RAG)',
@@ -440,7 +518,7 @@ Designed complex MySQL queries for high-performance data retrieval.""",
                 
                 <p>RAG has become essential for building enterprise AI applications that require access to proprietary knowledge bases and real-time information.</p>''',
                 'excerpt': 'Learn how Retrieval-Augmented Generation (RAG) combines information retrieval with language generation to create more accurate AI systems.',
-                'category': ai_category,
+                'category': 'ai-ml',
                 'tags': ['AI', 'RAG', 'Machine Learning'],
                 'status': 'published',
                 'published_date': datetime(2024, 1, 15, 10, 0, 0),
@@ -471,7 +549,7 @@ Designed complex MySQL queries for high-performance data retrieval.""",
                 
                 <p>Microservices architecture allows teams to work independently, scale services based on demand, and adopt different technologies for different services.</p>''',
                 'excerpt': 'Explore how to build scalable microservices architectures using Django and best practices for service design and deployment.',
-                'category': tech_category,
+                'category': 'technology',
                 'tags': ['Django', 'Microservices', 'Software Engineering'],
                 'status': 'published',
                 'published_date': datetime(2024, 2, 10, 14, 30, 0),
@@ -506,7 +584,7 @@ Designed complex MySQL queries for high-performance data retrieval.""",
                 
                 <p>Leadership is about enabling your team to do their best work while aligning technical efforts with business objectives.</p>''',
                 'excerpt': 'Key lessons learned from 14+ years of leading engineering teams, including building trust, maintaining technical excellence, and implementing effective processes.',
-                'category': career_category,
+                'category': 'career',
                 'tags': ['Leadership', 'Software Engineering'],
                 'status': 'published',
                 'published_date': datetime(2024, 3, 5, 9, 0, 0),
@@ -545,7 +623,7 @@ Designed complex MySQL queries for high-performance data retrieval.""",
                 
                 <p>Fine-tuning LLMs can significantly improve performance for specific use cases, but it's important to evaluate whether the benefits justify the costs.</p>''',
                 'excerpt': 'A practical guide to fine-tuning Large Language Models for enterprise applications, including when to fine-tune and best practices.',
-                'category': ai_category,
+                'category': 'ai-ml',
                 'tags': ['AI', 'LLM', 'Machine Learning'],
                 'status': 'published',
                 'published_date': datetime(2024, 3, 20, 11, 0, 0),
@@ -586,7 +664,7 @@ Designed complex MySQL queries for high-performance data retrieval.""",
                 
                 <p>Successful modernization can reduce operational costs by 20% or more while improving system scalability and developer productivity.</p>''',
                 'excerpt': 'Learn systematic approaches to modernizing legacy Python codebases, including assessment strategies and implementation techniques.',
-                'category': tech_category,
+                'category': 'technology',
                 'tags': ['Python', 'Software Engineering'],
                 'status': 'published',
                 'published_date': datetime(2024, 4, 12, 15, 0, 0),
@@ -609,7 +687,7 @@ Designed complex MySQL queries for high-performance data retrieval.""",
                 
                 <h3>Building Your First FastAPI Application</h3>
                 <p>Here's a quick example of a FastAPI endpoint:</p>
-                <pre><code>from fastapi import FastAPI
+                <pre><code class="language-python">from fastapi import FastAPI
 from pydantic import BaseModel
 
 app = FastAPI()
@@ -633,7 +711,7 @@ async def create_item(item: Item):
                 
                 <p>FastAPI is ideal for building modern, scalable APIs that require high performance and developer productivity.</p>''',
                 'excerpt': 'Discover how FastAPI combines high performance, automatic validation, and modern Python features to revolutionize API development.',
-                'category': tech_category,
+                'category': 'technology',
                 'tags': ['FastAPI', 'Python', 'API Development'],
                 'status': 'published',
                 'published_date': datetime(2024, 5, 8, 10, 0, 0),
@@ -664,7 +742,7 @@ async def create_item(item: Item):
                 
                 <h3>Implementation with LangChain</h3>
                 <p>LangChain provides excellent tools for hybrid search:</p>
-                <pre><code>from langchain.retrievers import BM25Retriever, EnsembleRetriever
+                <pre><code class="language-python">from langchain.retrievers import BM25Retriever, EnsembleRetriever
 from langchain.vectorstores import Chroma
 
 # Combine vector and keyword search
@@ -686,7 +764,7 @@ ensemble_retriever = EnsembleRetriever(
                 
                 <p>Advanced RAG techniques can improve retrieval accuracy by 30-50% compared to basic vector search, making them essential for production AI applications.</p>''',
                 'excerpt': 'Learn advanced RAG techniques including hybrid search and re-ranking to significantly improve retrieval accuracy in production systems.',
-                'category': ai_category,
+                'category': 'ai-ml',
                 'tags': ['RAG', 'AI', 'Machine Learning', 'LangChain'],
                 'status': 'published',
                 'published_date': datetime(2024, 5, 22, 14, 0, 0),
@@ -708,7 +786,7 @@ ensemble_retriever = EnsembleRetriever(
                 
                 <h3>Essential Optimization Techniques</h3>
                 <h4>1. Use select_related() for Foreign Keys</h4>
-                <pre><code># Bad: N+1 queries
+                <pre><code class="language-python"># Bad: N+1 queries
 authors = Author.objects.all()
 for author in authors:
     print(author.publisher.name)  # Query for each author
@@ -717,17 +795,17 @@ for author in authors:
 authors = Author.objects.select_related('publisher').all()</code></pre>
                 
                 <h4>2. Use prefetch_related() for Many-to-Many</h4>
-                <pre><code># Efficiently fetch related objects
+                <pre><code class="language-python"># Efficiently fetch related objects
 books = Book.objects.prefetch_related('authors', 'categories').all()</code></pre>
                 
                 <h4>3. Use only() and defer() for Partial Loading</h4>
-                <pre><code># Load only needed fields
+                <pre><code class="language-python"># Load only needed fields
 users = User.objects.only('username', 'email')
 # Defer heavy fields
 articles = Article.objects.defer('content')</code></pre>
                 
                 <h4>4. Database-level Aggregations</h4>
-                <pre><code># Use annotations instead of Python loops
+                <pre><code class="language-python"># Use annotations instead of Python loops
 from django.db.models import Count, Avg
 publishers = Publisher.objects.annotate(
     book_count=Count('book'),
@@ -739,7 +817,7 @@ publishers = Publisher.objects.annotate(
                 
                 <p>Proper ORM optimization can reduce database queries by 80-90% and improve response times significantly, especially for complex data relationships.</p>''',
                 'excerpt': 'Learn essential Django ORM optimization techniques to eliminate N+1 queries, reduce database load, and improve application performance.',
-                'category': tech_category,
+                'category': 'technology',
                 'tags': ['Django', 'Python', 'Performance'],
                 'status': 'published',
                 'published_date': datetime(2024, 6, 5, 11, 0, 0),
@@ -753,7 +831,7 @@ publishers = Publisher.objects.annotate(
                 
                 <h3>Project Structure</h3>
                 <p>Organize your Flask API project properly:</p>
-                <pre><code>project/
+                <pre><code class="language-text">project/
 ├── app/
 │   ├── __init__.py
 │   ├── models.py
@@ -797,7 +875,7 @@ publishers = Publisher.objects.annotate(
                 </ul>
                 
                 <h3>Example: Well-Structured Endpoint</h3>
-                <pre><code>from flask import Blueprint, request, jsonify
+                <pre><code class="language-python">from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
 
@@ -826,7 +904,7 @@ def get_users():
                 
                 <p>Following these practices ensures your Flask API is maintainable, secure, and ready for production deployment.</p>''',
                 'excerpt': 'Learn best practices for building production-ready RESTful APIs with Flask, including project structure, security, and design principles.',
-                'category': tech_category,
+                'category': 'technology',
                 'tags': ['Flask', 'Python', 'API Development'],
                 'status': 'published',
                 'published_date': datetime(2024, 6, 18, 9, 0, 0),
@@ -880,7 +958,7 @@ def get_users():
                 
                 <h3>Architecture Patterns</h3>
                 <p>Common patterns for production AI:</p>
-                <pre><code># Example: Async processing with queue
+                <pre><code class="language-python"># Example: Async processing with queue
 from celery import Celery
 
 app = Celery('ai_tasks')
@@ -909,7 +987,7 @@ def generate():
                 
                 <p>Successfully deploying generative AI requires balancing performance, cost, and quality while maintaining system reliability and user trust.</p>''',
                 'excerpt': 'Explore the challenges of deploying generative AI in production and learn practical solutions for cost management, latency, reliability, and quality.',
-                'category': ai_category,
+                'category': 'ai-ml',
                 'tags': ['Generative AI', 'AI', 'Machine Learning', 'Production'],
                 'status': 'published',
                 'published_date': datetime(2024, 7, 2, 13, 0, 0),
@@ -932,7 +1010,7 @@ def generate():
                 
                 <h3>Advanced Async Patterns</h3>
                 <h4>1. Concurrent Task Execution</h4>
-                <pre><code>import asyncio
+                <pre><code class="language-python">import asyncio
 
 async def fetch_data(url):
     # Simulate API call
@@ -951,13 +1029,13 @@ async def main():
 # All three fetch_data calls run concurrently</code></pre>
                 
                 <h4>2. Task Groups (Python 3.11+)</h4>
-                <pre><code>async def process_items(items):
+                <pre><code class="language-python">async def process_items(items):
     async with asyncio.TaskGroup() as tg:
         tasks = [tg.create_task(process_item(item)) for item in items]
     # All tasks complete or one fails (raises exception)</code></pre>
                 
                 <h4>3. Async Context Managers</h4>
-                <pre><code>class AsyncDatabaseConnection:
+                <pre><code class="language-python">class AsyncDatabaseConnection:
     async def __aenter__(self):
         self.conn = await connect_to_db()
         return self.conn
@@ -988,7 +1066,7 @@ async def use_db():
                 
                 <p>Mastering async Python enables building highly concurrent applications that efficiently handle thousands of simultaneous connections, making it ideal for APIs, web scrapers, and real-time systems.</p>''',
                 'excerpt': 'Dive deep into Python async programming with advanced patterns, best practices, and performance optimization techniques for building concurrent applications.',
-                'category': tech_category,
+                'category': 'technology',
                 'tags': ['Python', 'Async Programming', 'Web Development'],
                 'status': 'published',
                 'published_date': datetime(2024, 7, 15, 10, 0, 0),
@@ -1011,7 +1089,7 @@ async def use_db():
                 
                 <h4>2. Mean Reciprocal Rank (MRR)</h4>
                 <p>Measures the rank of the first relevant document:</p>
-                <pre><code>MRR = (1/n) * Σ(1/rank_i)
+                <pre><code class="language-text">MRR = (1/n) * Σ(1/rank_i)
 # Where rank_i is the position of first relevant doc for query i</code></pre>
                 
                 <h4>3. Normalized Discounted Cumulative Gain (NDCG)</h4>
@@ -1020,7 +1098,7 @@ async def use_db():
                 <h3>Generation Evaluation Metrics</h3>
                 <h4>1. Semantic Similarity</h4>
                 <p>Use embedding models to measure semantic similarity between generated and reference answers:</p>
-                <pre><code>from sentence_transformers import SentenceTransformer
+                <pre><code class="language-python">from sentence_transformers import SentenceTransformer
 
 model = SentenceTransformer('all-MiniLM-L6-v2')
 generated_embedding = model.encode(generated_answer)
@@ -1061,7 +1139,7 @@ similarity = cosine_similarity(generated_embedding, reference_embedding)</code><
                 
                 <p>Proper evaluation enables data-driven improvements to your RAG system, ensuring it meets quality standards before production deployment.</p>''',
                 'excerpt': 'Learn comprehensive strategies for evaluating RAG systems, including retrieval metrics, generation quality assessment, and automated evaluation tools.',
-                'category': ai_category,
+                'category': 'ai-ml',
                 'tags': ['RAG', 'AI', 'Machine Learning', 'Evaluation'],
                 'status': 'published',
                 'published_date': datetime(2024, 8, 1, 14, 0, 0),
@@ -1083,7 +1161,7 @@ similarity = cosine_similarity(generated_embedding, reference_embedding)</code><
                 </ul>
                 
                 <h3>Setting Up Channels</h3>
-                <pre><code># settings.py
+                <pre><code class="language-python"># settings.py
 INSTALLED_APPS = [
     'django.contrib.auth',
     'channels',
@@ -1096,7 +1174,7 @@ ASGI_APPLICATION = 'myproject.asgi.application'
 # pip install channels channels-redis</code></pre>
                 
                 <h3>Building a WebSocket Consumer</h3>
-                <pre><code>from channels.generic.websocket import AsyncWebsocketConsumer
+                <pre><code class="language-python">from channels.generic.websocket import AsyncWebsocketConsumer
 import json
 
 class ChatConsumer(AsyncWebsocketConsumer):
@@ -1160,7 +1238,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 
                 <p>Django Channels enables building modern, real-time web applications while leveraging Django's powerful ecosystem and familiar patterns.</p>''',
                 'excerpt': 'Learn how to build real-time applications with Django Channels, including WebSocket consumers, channel layers, and best practices for production.',
-                'category': tech_category,
+                'category': 'technology',
                 'tags': ['Django', 'Python', 'Web Development', 'Real-Time'],
                 'status': 'published',
                 'published_date': datetime(2024, 8, 12, 11, 0, 0),
@@ -1203,7 +1281,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 <h3>Common High-Level Design Patterns</h3>
                 <h4>1. Microservices Architecture</h4>
                 <p>Break down application into independent, loosely coupled services:</p>
-                <pre><code>┌─────────────┐    ┌─────────────┐    ┌─────────────┐
+                <pre><code class="language-text">┌─────────────┐    ┌─────────────┐    ┌─────────────┐
 │   API       │    │   User      │    │   Payment   │
 │   Gateway   │───▶│   Service   │    │   Service   │
 └─────────────┘    └─────────────┘    └─────────────┘
@@ -1226,7 +1304,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 
                 <h4>3. Event-Driven Architecture</h4>
                 <p>Components communicate through events:</p>
-                <pre><code># Example: Event-driven system
+                <pre><code class="language-python"># Example: Event-driven system
 class OrderService:
     def create_order(self, order_data):
         order = self.save_order(order_data)
@@ -1284,7 +1362,7 @@ class PaymentService:
                 
                 <p>High-level system design is about making informed architectural decisions that balance requirements, constraints, and future scalability needs.</p>''',
                 'excerpt': 'Learn the fundamentals of high-level system design, including scalability patterns, architecture styles, and best practices for building robust systems.',
-                'category': tech_category,
+                'category': 'technology',
                 'tags': ['System Design', 'Architecture', 'Scalability', 'Software Engineering'],
                 'status': 'published',
                 'published_date': datetime(2024, 12, 20, 10, 0, 0),
@@ -1311,7 +1389,7 @@ class PaymentService:
                 <p>Common patterns for component design:</p>
                 
                 <h5>Factory Pattern</h5>
-                <pre><code>class PaymentProcessorFactory:
+                <pre><code class="language-python">class PaymentProcessorFactory:
     @staticmethod
     def create_processor(payment_type):
         if payment_type == 'credit_card':
@@ -1328,7 +1406,7 @@ processor = PaymentProcessorFactory.create_processor('stripe')
 processor.process_payment(amount)</code></pre>
                 
                 <h5>Observer Pattern</h5>
-                <pre><code>class EventPublisher:
+                <pre><code class="language-python">class EventPublisher:
     def __init__(self):
         self._observers = []
     
@@ -1350,7 +1428,7 @@ publisher.subscribe(EmailService())
 publisher.notify(OrderEvent('order_placed', order_data))</code></pre>
                 
                 <h5>Strategy Pattern</h5>
-                <pre><code>class SortingStrategy:
+                <pre><code class="language-python">class SortingStrategy:
     def sort(self, data):
         raise NotImplementedError
 
@@ -1373,7 +1451,7 @@ class DataProcessor:
                 
                 <h3>Designing Data Structures</h3>
                 <h4>1. Cache Implementation</h4>
-                <pre><code>from collections import OrderedDict
+                <pre><code class="language-python">from collections import OrderedDict
 
 class LRUCache:
     def __init__(self, capacity):
@@ -1397,7 +1475,7 @@ class LRUCache:
             self.cache.popitem(last=False)</code></pre>
                 
                 <h4>2. Rate Limiter</h4>
-                <pre><code>from collections import deque
+                <pre><code class="language-python">from collections import deque
 import time
 
 class RateLimiter:
@@ -1418,7 +1496,7 @@ class RateLimiter:
         return False</code></pre>
                 
                 <h3>Component Design Example: Task Scheduler</h3>
-                <pre><code>from heapq import heappush, heappop
+                <pre><code class="language-python">from heapq import heappush, heappop
 import threading
 import time
 
@@ -1478,7 +1556,7 @@ class TaskScheduler:
                 </ul>
                 
                 <h4>3. Concurrency</h4>
-                <pre><code>import asyncio
+                <pre><code class="language-python">import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
 class AsyncDataProcessor:
@@ -1498,7 +1576,7 @@ class AsyncDataProcessor:
         return processed_item</code></pre>
                 
                 <h3>Error Handling and Resilience</h3>
-                <pre><code>class RetryableOperation:
+                <pre><code class="language-python">class RetryableOperation:
     def __init__(self, max_retries=3, backoff_factor=2):
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
@@ -1527,7 +1605,7 @@ class AsyncDataProcessor:
                 
                 <p>Low-level design transforms architectural blueprints into concrete, implementable components that are efficient, maintainable, and aligned with system requirements.</p>''',
                 'excerpt': 'Master low-level system design with design patterns, data structures, and component implementation strategies for building efficient software systems.',
-                'category': tech_category,
+                'category': 'technology',
                 'tags': ['System Design', 'Design Patterns', 'Data Structures', 'Software Engineering'],
                 'status': 'published',
                 'published_date': datetime(2024, 12, 22, 14, 0, 0),
@@ -1558,7 +1636,7 @@ class AsyncDataProcessor:
                 
                 <h3>High-Level Design</h3>
                 <h4>Architecture Overview</h4>
-                <pre><code>┌─────────────┐
+                <pre><code class="language-text">┌─────────────┐
 │   Client    │
 └──────┬──────┘
        │
@@ -1591,7 +1669,7 @@ class AsyncDataProcessor:
                 
                 <h3>Low-Level Design</h3>
                 <h4>Cache Node Implementation</h4>
-                <pre><code>from collections import OrderedDict
+                <pre><code class="language-python">from collections import OrderedDict
 import threading
 import time
 
@@ -1641,7 +1719,7 @@ class CacheNode:
                     del self.expiry_times[key]</code></pre>
                 
                 <h4>Consistent Hashing</h4>
-                <pre><code>import hashlib
+                <pre><code class="language-python">import hashlib
 
 class ConsistentHash:
     def __init__(self, nodes, replicas=3):
@@ -1675,7 +1753,7 @@ class ConsistentHash:
         return self.ring[self.sorted_keys[0]]</code></pre>
                 
                 <h4>Distributed Cache Client</h4>
-                <pre><code>class DistributedCache:
+                <pre><code class="language-python">class DistributedCache:
     def __init__(self, nodes):
         self.hash_ring = ConsistentHash(nodes)
         self.nodes = {node: CacheNode(capacity=10000) for node in nodes}
@@ -1724,7 +1802,7 @@ class ConsistentHash:
                 
                 <p>This design demonstrates how to approach system design problems by breaking them down into high-level architecture and low-level implementation details.</p>''',
                 'excerpt': 'Step-by-step guide to designing a distributed cache system, covering consistent hashing, replication, and implementation details for system design interviews.',
-                'category': tech_category,
+                'category': 'technology',
                 'tags': ['System Design', 'Distributed Systems', 'Caching', 'Interview'],
                 'status': 'published',
                 'published_date': datetime(2024, 12, 24, 16, 0, 0),
@@ -1913,7 +1991,7 @@ class ConsistentHash:
                 <h3>Practice Makes Perfect</h3>
                 <p>Remember, the best way to learn programming is by practicing. Try to write code every day, solve problems, and build small projects. Each topic in this guide includes practical examples that you can try yourself.</p>''',
                 'excerpt': 'Complete Python learning guide from basics to advanced. Learn Python fundamentals, intermediate concepts, and advanced topics with detailed explanations.',
-                'category': tech_category,
+                'category': 'technology',
                 'tags': ['Python', 'Programming', 'Learning', 'Tutorial'],
                 'status': 'published',
                 'published_date': datetime(2024, 12, 25, 10, 0, 0),
@@ -1921,57 +1999,73 @@ class ConsistentHash:
             }
         ]
         
-        for post_data in blog_posts:
+        changed_posts = [post_data for post_data in blog_posts
+                         if seed.changed(f"post:{post_data['slug']}", post_data)]
+        if changed_posts:
+            categories = {c.slug: c for c in Category.query.filter(
+                Category.slug.in_({post_data['category'] for post_data in changed_posts}))}
+            # Posts are tagged only with the seeded tags
+            tag_objects = {t.name: t for t in Tag.query.filter(Tag.slug.in_([slugify(n) for n in tags_data]))
+                           if t.name in tags_data}
+            existing_posts = {p.slug: p for p in Post.query.filter(
+                Post.slug.in_([post_data['slug'] for post_data in changed_posts]))}
+            # New users and categories need their ids before posts refer to them
+            db.session.flush()
+        
+        new_posts = []
+        for post_data in changed_posts:
+            post_tags = [tag_objects[tag_name] for tag_name in post_data['tags'] if tag_name in tag_objects]
+            
             # Check if post already exists
-            existing_post = Post.query.filter_by(slug=post_data['slug']).first()
+            existing_post = existing_posts.get(post_data['slug'])
             if existing_post:
                 # Update existing post with latest data
-                existing_post.title = post_data['title']
-                existing_post.content = post_data['content']
-                existing_post.excerpt = post_data['excerpt']
-                existing_post.published_date = post_data['published_date']
-                existing_post.status = post_data['status']
+                values = {
+                    'title': post_data['title'],
+                    'content': post_data['content'],
+                    'excerpt': post_data['excerpt'],
+                    'published_date': post_data['published_date'],
+                    'status': post_data['status'],
+                }
                 if post_data.get('featured_image'):
-                    existing_post.featured_image = post_data.get('featured_image', '')
-                # Update tags
-                existing_post.tags = []
-                for tag_name in post_data['tags']:
-                    if tag_name in tag_objects:
-                        existing_post.tags.append(tag_objects[tag_name])
-                print(f"Updated existing post: {existing_post.title}")
+                    values['featured_image'] = post_data['featured_image']
+                changes = {column: value for column, value in values.items()
+                           if getattr(existing_post, column) != value}
+                for column, value in changes.items():
+                    setattr(existing_post, column, value)
+                if set(existing_post.tags) != set(post_tags):
+                    existing_post.tags = post_tags
+                    changes['tags'] = post_tags
+                if changes:
+                    print(f"Updated existing post: {existing_post.title}")
                 continue
             
-            post = Post(
-                title=post_data['title'],
-                slug=post_data['slug'],
-                author_id=admin_user.id,
-                content=post_data['content'],
-                excerpt=post_data['excerpt'],
-                category_id=post_data['category'].id,
-                status=post_data['status'],
-                published_date=post_data['published_date'],
-                meta_description=post_data['excerpt'][:160],
-                meta_keywords=', '.join(post_data['tags']),
-                featured_image=post_data.get('featured_image', '')
-            )
-            
-            # Add tags
-            for tag_name in post_data['tags']:
-                if tag_name in tag_objects:
-                    post.tags.append(tag_objects[tag_name])
-            
-            db.session.add(post)
+            new_posts.append({
+                'title': post_data['title'],
+                'slug': post_data['slug'],
+                'author_id': admin_user.id,
+                'content': post_data['content'],
+                'excerpt': post_data['excerpt'],
+                'category_id': categories[post_data['category']].id,
+                'status': post_data['status'],
+                'published_date': post_data['published_date'],
+                'meta_keywords': ', '.join(post_data['tags']),
+                'featured_image': post_data.get('featured_image', ''),
+                'tags': [tag.name for tag in post_tags]
+            })
+        
+        insert_posts(new_posts)
+        if new_posts:
+            print(f"Added {len(new_posts)} blog posts")
         
         # Commit all changes
+        changed = sorted(seed.pending)
+        seed.save()
         db.session.commit()
-        print("Portfolio and blog data populated successfully!")
-        print(f"Profile created for: {profile.name}")
-        print(f"Added {len(experiences)} experiences")
-        print(f"Added {len(skills_data)} skills")
-        print(f"Added {len(certifications)} certifications")
-        print(f"Added {len(achievements)} achievements")
-        print(f"Added {len(projects)} projects")
-        print(f"Added {len(blog_posts)} blog posts")
+        if changed:
+            print(f"Portfolio and blog data populated successfully! ({len(changed)} seed sections changed)")
+        else:
+            print("Portfolio and blog data is up to date")
 
 if __name__ == '__main__':
     populate_database()
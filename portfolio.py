@@ -0,0 +1,89 @@
+"""
+Portfolio snapshot
+
+The homepage, resume and contact pages are rendered from one precomputed
+snapshot of the profile, education, experience, skills, projects and
+achievements: skills already grouped by category, certifications split from
+achievements, featured and freelance projects picked out. It is built on
+first use and kept until one of those tables is written (by
+populate_database or an admin edit), so in steady state these pages run no
+queries. The rows are detached from the session and the collections are
+read-only, so the snapshot can be shared by every request.
+"""
+from collections import namedtuple
+from types import MappingProxyType
+from models import db, Profile, Education, Experience, Skill, Project, Achievement
+from cache import Cache
+
+PORTFOLIO_TABLES = ('profiles', 'educations', 'experiences', 'skills', 'projects', 'achievements')
+
+# Skills shown on the homepage: core frameworks, AI/ML, databases and tools
+HOMEPAGE_SKILLS = frozenset([
+    'Python', 'Django', 'Flask', 'FastAPI',
+    'Generative AI', 'RAG (Retrieval-Augmented Generation)', 'LLM Fine-tuning', 'OpenAI API',
+    'MySQL', 'SQL',
+    'AWS', 'Docker', 'Git'
+])
+
+# Achievements ordered below this are certifications
+CERTIFICATION_ORDER_LIMIT = 10
+
+FEATURED_PROJECTS = 3
+
+Portfolio = namedtuple('Portfolio', [
+    'profile',
+    'featured_projects',
+    'homepage_skills_by_category',
+    'educations',
+    'experiences',
+    'skills_by_category',
+    'projects',
+    'certifications',
+    'achievements',
+    'freelance_work',
+])
+
+_portfolio = Cache('portfolio', tables=PORTFOLIO_TABLES)
+
+
+def group_skills(skills):
+    """Skills by display category name, in the order given"""
+    names = dict(Skill.SKILL_CATEGORIES)
+    groups = {}
+    for skill in skills:
+        groups.setdefault(names.get(skill.category, skill.category), []).append(skill)
+    return MappingProxyType({category: tuple(members) for category, members in groups.items()})
+
+
+def build_portfolio():
+    """Load the portfolio tables and derive every page's sections"""
+    profile = Profile.query.first()
+    educations = Education.query.order_by(Education.order.desc(), Education.start_date.desc()).all()
+    experiences = Experience.query.order_by(Experience.current.desc(), Experience.start_date.desc()).all()
+    skills = Skill.query.order_by(Skill.category, Skill.order, Skill.name).all()
+    projects = Project.query.order_by(Project.date.desc()).all()
+    all_achievements = Achievement.query.order_by(Achievement.order.asc(), Achievement.date.desc()).all()
+
+    for row in [profile, *educations, *experiences, *skills, *projects, *all_achievements]:
+        if row is not None:
+            db.session.expunge(row)
+
+    # Projects are already newest first
+    featured = [p for p in projects if p.featured]
+    return Portfolio(
+        profile=profile,
+        featured_projects=tuple(featured[:FEATURED_PROJECTS]),
+        homepage_skills_by_category=group_skills(s for s in skills if s.name in HOMEPAGE_SKILLS),
+        educations=tuple(educations),
+        experiences=tuple(experiences),
+        skills_by_category=group_skills(skills),
+        projects=tuple(projects),
+        certifications=tuple(a for a in all_achievements if a.order < CERTIFICATION_ORDER_LIMIT),
+        achievements=tuple(a for a in all_achievements if a.order >= CERTIFICATION_ORDER_LIMIT),
+        freelance_work=tuple(p for p in projects if not p.featured),
+    )
+
+
+def get_portfolio():
+    """The current portfolio snapshot"""
+    return _portfolio.get_or_set('snapshot', build_portfolio)
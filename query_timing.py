@@ -0,0 +1,127 @@
+"""
+Per-request query instrumentation
+
+Every SQL statement executed while serving a request is counted and timed,
+and grouped by fingerprint: the statement with its literals, parameters and
+IN lists reduced to `?`, so the same query for different rows counts as
+one shape. At the end of the request:
+
+- a `Server-Timing: db;dur=...;desc="N queries"` header shows the count and
+  total database time in the browser's network panel (outside debug mode,
+  only to admins);
+- a shape that ran more than QUERY_REPEAT_THRESHOLD times is logged as a
+  likely N+1, e.g. a relationship lazy-loaded once per row of a listing;
+- logged-in admins get a collapsed panel at the bottom of HTML pages listing
+  the shapes by time.
+
+Statements outside requests (CLI commands, background threads) and those a
+streamed response runs after its headers are sent are not recorded. For a
+quick count in tests see querycount.py.
+"""
+import re
+import time
+from collections import defaultdict
+from flask import current_app, g, has_request_context, render_template, request
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Shapes listed in the admin panel
+PANEL_ROWS = 20
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAMETER = re.compile(r'%\(\w+\)s|%s|\$\d+|\?')
+_NUMBER = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(statement):
+    """`statement` with literals and parameters replaced by ?, for grouping"""
+    statement = _STRING.sub('?', statement)
+    statement = _PARAMETER.sub('?', statement)
+    statement = _NUMBER.sub('?', statement)
+    statement = _IN_LIST.sub('(?)', statement)
+    return _SPACE.sub(' ', statement).strip()
+
+
+class RequestQueries:
+    """Statements executed during one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        # fingerprint -> [executions, seconds]
+        self.shapes = defaultdict(lambda: [0, 0.0])
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        shape = self.shapes[fingerprint(statement)]
+        shape[0] += 1
+        shape[1] += duration
+
+    def repeated(self, threshold):
+        """(fingerprint, executions) of shapes run more than `threshold` times"""
+        return [(sql, count) for sql, (count, _) in self.shapes.items() if count > threshold]
+
+    def by_time(self):
+        """(fingerprint, executions, seconds), slowest first"""
+        return sorted(((sql, count, seconds) for sql, (count, seconds) in self.shapes.items()),
+                      key=lambda row: row[2], reverse=True)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and has_request_context() and 'query_stats' in g:
+        context.query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'query_started', None)
+    if started is not None and has_request_context() and 'query_stats' in g:
+        g.query_stats.record(statement, time.perf_counter() - started)
+
+
+def _begin_request():
+    g.query_stats = RequestQueries()
+
+
+def _is_admin():
+    # Looking up the user reads the session; skip it for visitors without one
+    if current_app.config['SESSION_COOKIE_NAME'] not in request.cookies:
+        return False
+    return current_user.is_authenticated and current_user.is_admin
+
+
+def _end_request(response):
+    stats = g.pop('query_stats', None)
+    if stats is None:
+        return response
+
+    is_admin = _is_admin()
+    if is_admin or current_app.debug:
+        queries = 'query' if stats.count == 1 else 'queries'
+        response.headers.add('Server-Timing', f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} {queries}"')
+
+    threshold = current_app.config['QUERY_REPEAT_THRESHOLD']
+    repeated = stats.repeated(threshold)
+    for sql, count in repeated:
+        print(f"Possible N+1 on {request.method} {request.path}: {count} x {sql[:200]}")
+
+    if is_admin and not response.is_streamed and response.mimetype == 'text/html':
+        panel = render_template('admin/query_panel.html', stats=stats, rows=stats.by_time()[:PANEL_ROWS],
+                                repeated=dict(repeated), threshold=threshold)
+        body = response.get_data(as_text=True)
+        if '</body>' in body:
+            response.set_data(body.replace('</body>', panel + '</body>', 1))
+    return response
+
+
+def init_query_timing(app):
+    """Record the queries of each request"""
+    if not app.config.get('QUERY_TIMING_ENABLED', True):
+        return
+    app.before_request(_begin_request)
+    app.after_request(_end_request)
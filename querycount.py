@@ -0,0 +1,38 @@
+"""
+Query counting for tests and debugging
+
+    with assert_max_queries(4):
+        client.get('/blog?page=3')
+
+Statements are captured at the engine, so queries from background threads
+(view counter, scheduler) running at the same moment are counted too.
+"""
+from contextlib import contextmanager
+from sqlalchemy import event
+from models import db
+
+
+@contextmanager
+def count_queries(engine=None):
+    """Collect the SQL statements executed inside the block into a list"""
+    engine = engine or db.engine
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@contextmanager
+def assert_max_queries(limit, engine=None):
+    """Fail if the block executes more than `limit` statements, listing them"""
+    with count_queries(engine) as statements:
+        yield statements
+    if len(statements) > limit:
+        listing = '\n'.join(f'{i}. {statement}' for i, statement in enumerate(statements, start=1))
+        raise AssertionError(f'{len(statements)} queries executed, expected at most {limit}:\n{listing}')
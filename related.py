@@ -0,0 +1,343 @@
+"""
+Precomputed related posts
+
+Every published post gets a ranked list of its RELATED_POSTS_STORED nearest
+neighbours in the related_posts table. Similarity combines TF-IDF cosine
+similarity of the post text with Jaccard overlap of tags and a small bonus
+for a shared category. `flask related-rebuild` recomputes everything.
+
+Saving posts does not compute anything in the request: the commit queues the
+changed post ids in the related_queue table, and the post scheduler thread
+(or `flask related-update` from cron) later recomputes only the lists that
+can change. Each post's term counts are kept in memory by a digest of its
+text, so an update re-tokenizes only the posts whose text changed.
+"""
+import hashlib
+import re
+from collections import Counter
+from datetime import datetime
+import numpy as np
+from sqlalchemy import event, inspect
+from flask import current_app
+from models import db, Post, RelatedPost, post_tags
+from cache import invalidate
+from loading import RELATED_CARD
+from utils import strip_html
+
+CONTENT_WEIGHT = 0.7
+TAG_WEIGHT = 0.25
+CATEGORY_WEIGHT = 0.05
+
+# Vocabulary limits: keep the most common terms that occur in at least MIN_DF posts
+MAX_FEATURES = 5000
+MIN_DF = 2
+
+# Rows of the similarity matrix computed at once during a full rebuild
+BLOCK_SIZE = 256
+
+# Post fields that affect similarity
+TRACKED_FIELDS = ('title', 'excerpt', 'content', 'status', 'category_id', 'tags')
+
+STOP_WORDS = frozenset('''
+    a about above after again all also an and any are as at be because been before being below
+    between both but by can could did do does doing down during each few for from further had has
+    have having he her here hers him his how i if in into is it its itself just like more most my
+    no nor not now of off on once only or other our ours out over own same she should so some such
+    than that the their theirs them then there these they this those through to too under until up
+    use used using very was we were what when where which while who whom why will with would you
+    your yours
+'''.split())
+
+
+related_queue = db.Table('related_queue',
+    db.Column('post_id', db.Integer, primary_key=True),
+    db.Column('queued_at', db.DateTime, nullable=False)
+)
+
+# post id -> (digest of its text, term counts), reused while the text is unchanged
+_term_counts = {}
+
+
+def _tokenize(text):
+    return [word for word in re.findall(r'[a-z][a-z0-9+#]+', text.lower())
+            if len(word) > 2 and word not in STOP_WORDS]
+
+
+def _counts(row):
+    """Term frequencies of a post row; the title counts twice"""
+    text = f"{row.title} {row.title} {row.excerpt or ''} {row.content or ''}"
+    digest = hashlib.sha1(text.encode()).digest()
+    cached = _term_counts.get(row.id)
+    if cached is None or cached[0] != digest:
+        cached = (digest, Counter(_tokenize(f"{row.title} {row.title} {row.excerpt or ''} {strip_html(row.content)}")))
+        _term_counts[row.id] = cached
+    return cached[1]
+
+
+class _Model:
+    """TF-IDF vectors, tag sets and categories for all published posts"""
+
+    def __init__(self, connection):
+        posts = Post.__table__
+        rows = connection.execute(
+            db.select(posts.c.id, posts.c.title, posts.c.excerpt, posts.c.content, posts.c.category_id)
+            .where(posts.c.status == 'published')
+            .order_by(posts.c.id)
+        ).all()
+
+        self.ids = np.array([row.id for row in rows], dtype=np.int64)
+        self.index = {post_id: i for i, post_id in enumerate(self.ids.tolist())}
+        self.categories = np.array([row.category_id or 0 for row in rows], dtype=np.int64)
+
+        counts = [_counts(row) for row in rows]
+        for post_id in _term_counts.keys() - self.index.keys():
+            del _term_counts[post_id]
+        df = Counter(term for doc in counts for term in doc)
+        vocabulary = [term for term, n in df.most_common(MAX_FEATURES) if n >= MIN_DF]
+        columns = {term: j for j, term in enumerate(vocabulary)}
+
+        tf = np.zeros((len(rows), len(vocabulary)), dtype=np.float32)
+        for i, doc in enumerate(counts):
+            for term, n in doc.items():
+                j = columns.get(term)
+                if j is not None:
+                    tf[i, j] = 1 + np.log(n)
+        idf = np.log((1 + len(rows)) / (1 + np.array([df[t] for t in vocabulary], dtype=np.float32))) + 1
+        vectors = tf * idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.where(norms == 0, 1, norms)
+
+        tag_rows = connection.execute(db.select(post_tags.c.post_id, post_tags.c.tag_id)).all()
+        tag_ids = sorted({tag_id for _, tag_id in tag_rows})
+        tag_columns = {tag_id: j for j, tag_id in enumerate(tag_ids)}
+        self.tags = np.zeros((len(rows), len(tag_ids)), dtype=np.float32)
+        for post_id, tag_id in tag_rows:
+            i = self.index.get(post_id)
+            if i is not None:
+                self.tags[i, tag_columns[tag_id]] = 1
+        self.tag_counts = self.tags.sum(axis=1)
+
+    def scores(self, rows):
+        """Similarity of the posts at `rows` to every post (len(rows) x n)"""
+        content = self.vectors[rows] @ self.vectors.T
+
+        shared = self.tags[rows] @ self.tags.T
+        union = self.tag_counts[rows][:, None] + self.tag_counts[None, :] - shared
+        jaccard = np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+
+        category = self.categories[rows][:, None]
+        same_category = (category == self.categories[None, :]) & (category != 0)
+
+        scores = CONTENT_WEIGHT * content + TAG_WEIGHT * jaccard + CATEGORY_WEIGHT * same_category
+        scores[np.arange(len(rows)), rows] = -np.inf  # never related to itself
+        return scores
+
+    def neighbours(self, rows, k):
+        """Top-k (post_id, score) lists for the posts at `rows`"""
+        result = {}
+        for start in range(0, len(rows), BLOCK_SIZE):
+            block = np.asarray(rows[start:start + BLOCK_SIZE])
+            scores = self.scores(block)
+            top_k = min(k, len(self.ids) - 1)
+            if top_k <= 0:
+                for row in block:
+                    result[int(self.ids[row])] = []
+                continue
+            top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+            for i, row in enumerate(block):
+                order = top[i][np.argsort(-scores[i, top[i]])]
+                result[int(self.ids[row])] = [
+                    (int(self.ids[j]), float(scores[i, j])) for j in order if scores[i, j] > 0
+                ]
+        return result
+
+
+def _write(connection, lists):
+    """Replace the stored neighbour lists for the posts in `lists`"""
+    table = RelatedPost.__table__
+    post_ids = list(lists)
+    for start in range(0, len(post_ids), 500):
+        connection.execute(table.delete().where(table.c.post_id.in_(post_ids[start:start + 500])))
+    rows = [
+        {'post_id': post_id, 'rank': rank, 'related_post_id': related_id, 'score': score}
+        for post_id, neighbours in lists.items()
+        for rank, (related_id, score) in enumerate(neighbours, start=1)
+    ]
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+def rebuild_related_posts(connection=None):
+    """Recompute every neighbour list; returns the number of posts processed"""
+    if connection is None:
+        with db.engine.begin() as connection:
+            return rebuild_related_posts(connection)
+
+    model = _Model(connection)
+    lists = model.neighbours(list(range(len(model.ids))), current_app.config['RELATED_POSTS_STORED'])
+    connection.execute(RelatedPost.__table__.delete())
+    _write(connection, lists)
+    invalidate('related_posts')
+    return len(lists)
+
+
+def _chunks(values, size=500):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _affected_lists(connection, post_ids):
+    """New neighbour lists for the posts whose lists changes to `post_ids` can alter"""
+    k = current_app.config['RELATED_POSTS_STORED']
+    model = _Model(connection)
+    table = RelatedPost.__table__
+
+    changed = set(post_ids)
+    changed_rows = [model.index[post_id] for post_id in changed if post_id in model.index]
+    affected = set(changed)
+
+    if changed_rows:
+        # Scores are symmetric, so each changed post's row is also its column
+        best = model.scores(np.asarray(changed_rows)).max(axis=0)
+        candidates = {post_id: float(best[row]) for row, post_id in enumerate(model.ids.tolist())
+                      if post_id not in changed and best[row] > 0}
+        # A full list only changes if a changed post now beats its weakest entry
+        full = {}
+        for chunk in _chunks(candidates):
+            full.update(connection.execute(
+                db.select(table.c.post_id, db.func.min(table.c.score))
+                .where(table.c.post_id.in_(chunk))
+                .group_by(table.c.post_id)
+                .having(db.func.count() >= k)
+            ).all())
+        affected.update(post_id for post_id, score in candidates.items() if score > full.get(post_id, 0))
+
+    # Lists that point at changed posts (edited, unpublished or deleted)
+    for chunk in _chunks(changed):
+        affected.update(connection.execute(
+            db.select(table.c.post_id).where(table.c.related_post_id.in_(chunk)).distinct()
+        ).scalars())
+
+    rows = [model.index[post_id] for post_id in affected if post_id in model.index]
+    lists = model.neighbours(rows, k)
+    # Posts no longer published lose their lists
+    lists.update({post_id: [] for post_id in affected if post_id not in model.index})
+    return lists
+
+
+def update_related_posts(post_ids, connection=None):
+    """Recompute the lists affected by changes to `post_ids`; returns how many were written
+
+    The changed posts get fresh lists. Any other post is recomputed only if
+    a changed post was in its list or now scores above the weakest entry.
+    Untouched lists keep scores from older IDF weights, which drift slightly
+    as content changes; `flask related-rebuild` realigns them.
+    """
+    if connection is None:
+        # Compute on a read connection, then write in one short transaction
+        with db.engine.connect() as connection:
+            lists = _affected_lists(connection, post_ids)
+        with db.engine.begin() as connection:
+            _write(connection, lists)
+    else:
+        lists = _affected_lists(connection, post_ids)
+        _write(connection, lists)
+    invalidate('related_posts')
+    return len(lists)
+
+
+def queue_related_posts(post_ids):
+    """Queue `post_ids` for process_related_queue"""
+    now = datetime.utcnow()
+    with db.engine.begin() as connection:
+        for chunk in _chunks(post_ids):
+            connection.execute(related_queue.delete().where(related_queue.c.post_id.in_(chunk)))
+        connection.execute(related_queue.insert(), [{'post_id': post_id, 'queued_at': now} for post_id in post_ids])
+
+
+def process_related_queue():
+    """Update related posts for every queued post id; returns how many posts were queued"""
+    with db.engine.connect() as connection:
+        queued = connection.execute(db.select(related_queue.c.post_id, related_queue.c.queued_at)).all()
+    if not queued:
+        return 0
+    update_related_posts([post_id for post_id, _ in queued])
+    with db.engine.begin() as connection:
+        # Entries queued again while this ran stay for the next pass
+        connection.execute(
+            related_queue.delete().where(related_queue.c.post_id == db.bindparam('queued_id'),
+                                         related_queue.c.queued_at == db.bindparam('queued_time')),
+            [{'queued_id': post_id, 'queued_time': queued_at} for post_id, queued_at in queued]
+        )
+    return len(queued)
+
+
+def get_related_posts(post, limit=3):
+    """Related published posts for `post`, best first"""
+    related = (
+        Post.query.options(*RELATED_CARD).join(RelatedPost, RelatedPost.related_post_id == Post.id)
+        .filter(RelatedPost.post_id == post.id, Post.status == 'published')
+        .order_by(RelatedPost.rank)
+        .limit(limit)
+        .all()
+    )
+    if related:
+        return related
+    # Not computed yet: fall back to the newest posts in the same category
+    return Post.query.options(*RELATED_CARD).filter(
+        Post.category_id == post.category_id,
+        Post.status == 'published',
+        Post.id != post.id
+    ).order_by(Post.published_date.desc()).limit(limit).all()
+
+
+def _post_changed(post):
+    state = inspect(post)
+    return any(state.attrs[name].history.has_changes() for name in TRACKED_FIELDS)
+
+
+def mark_posts_changed(session, post_ids):
+    """Recompute related posts for `post_ids` when `session` commits (posts written without the ORM)"""
+    session.info.setdefault('related_post_ids', set()).update(post_ids)
+
+
+def _after_flush(session, flush_context):
+    changed = session.info.setdefault('related_post_ids', set())
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Post):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Post) and _post_changed(obj):
+            changed.add(obj.id)
+
+
+def _after_commit(session):
+    post_ids = session.info.pop('related_post_ids', None)
+    if not post_ids:
+        return
+    try:
+        queue_related_posts(post_ids)
+    except Exception as e:
+        print(f"Error queueing related posts: {e}")
+        return
+    if _Queue.wake:
+        _Queue.wake()
+
+
+def _after_soft_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('related_post_ids', None)
+
+
+class _Queue:
+    # Called after posts are queued, to start processing sooner
+    wake = None
+
+
+def init_related(app, wake=None):
+    """Queue related-post updates as posts are saved; `wake` is called after queueing"""
+    _Queue.wake = wake
+    event.listen(db.session, 'after_flush', _after_flush)
+    event.listen(db.session, 'after_commit', _after_commit)
+    event.listen(db.session, 'after_soft_rollback', _after_soft_rollback)
@@ -0,0 +1,85 @@
+"""
+Read-replica routing
+
+With DATABASE_REPLICA_URLS set, SELECTs made while serving the public GET
+pages listed in READ_REPLICA_ENDPOINTS go to a read replica, one picked at
+random per request. Everything else stays on the primary:
+
+- writes, and every statement after the first write in the same request;
+- admin pages, POSTs, CLI commands and background threads;
+- for READ_YOUR_WRITES_WINDOW seconds, any request from a client whose
+  earlier request wrote (remembered in its session cookie), so it sees its
+  own changes;
+- for the same window after any recorded table change, so caches cleared
+  by the change are not rebuilt from a replica that has not caught up.
+
+The window should exceed the replicas' usual lag. Replicas are plain
+Flask-SQLAlchemy binds named replica-1, replica-2, ... Replication itself
+is the database's job; to try this locally, run `flask db-optimize` (which
+folds the SQLite WAL into the file), copy instance/site.db to
+instance/replica.db and set DATABASE_REPLICA_URLS=sqlite:///replica.db
+(relative SQLite paths are resolved against the instance folder; an
+absolute path such as sqlite:////srv/app/replica.db works too).
+"""
+import random
+import time
+from fnmatch import fnmatchcase
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+
+REPLICA_PREFIX = 'replica-'
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the request's replica until the first write"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or getattr(clause, 'is_dml', False):
+                # Stay on the primary for the rest of the request
+                self.info['wrote'] = True
+            elif g.get('db_replica') and not self.info.get('wrote') and getattr(clause, 'is_select', False):
+                return self._db.engines[g.db_replica]
+        # Text statements and raw connections use the primary too
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_binds(urls):
+    """SQLALCHEMY_BINDS entries for the replica `urls`"""
+    return {f'{REPLICA_PREFIX}{number}': url for number, url in enumerate(urls, 1)}
+
+
+def _choose_replica():
+    g.db_replica = None
+    config = current_app.config
+    replicas = [key for key in config.get('SQLALCHEMY_BINDS') or {} if key.startswith(REPLICA_PREFIX)]
+    if not replicas or request.method not in ('GET', 'HEAD') or not any(
+        fnmatchcase(request.endpoint or '', pattern) for pattern in config['READ_REPLICA_ENDPOINTS']
+    ):
+        return
+    window = config['READ_YOUR_WRITES_WINDOW']
+    if session.get('primary_until', 0) > time.time():
+        return
+    # cache imports models, which imports this module
+    from cache import sync, last_changed
+    sync()
+    changed = last_changed()
+    if changed is not None and time.time() - changed.timestamp() < window:
+        return
+    g.db_replica = random.choice(replicas)
+
+
+def _remember_write(response):
+    if current_app.extensions['sqlalchemy'].session().info.get('wrote'):
+        session['primary_until'] = time.time() + current_app.config['READ_YOUR_WRITES_WINDOW']
+    return response
+
+
+def init_routing(app):
+    """Add the replica binds and per-request routing; call before db.init_app"""
+    urls = app.config.get('DATABASE_REPLICA_URLS') or []
+    if not urls:
+        return
+    app.config['SQLALCHEMY_BINDS'] = {**(app.config.get('SQLALCHEMY_BINDS') or {}), **replica_binds(urls)}
+    app.before_request(_choose_replica)
+    app.after_request(_remember_write)
@@ -0,0 +1,75 @@
+"""
+Publishing of scheduled posts
+
+Due posts are flipped to 'published' in a single UPDATE, either by the
+background PostScheduler thread or by `flask publish-scheduled` from cron.
+The thread sleeps until the next post is due (capped at
+SCHEDULER_POLL_INTERVAL so posts scheduled by other workers are noticed),
+and only the worker holding the instance-folder lock runs it. The same
+thread works through the queue of related-post updates (see related.py).
+"""
+from datetime import datetime
+from models import db, Post
+from cache import mark_changed
+from related import mark_posts_changed, process_related_queue
+from workers import PeriodicWorker
+
+
+def publish_due_posts(now=None):
+    """Publish every scheduled post whose time has come; returns how many were published"""
+    now = now or datetime.utcnow()
+    due_ids = [post_id for (post_id,) in db.session.query(Post.id).filter(
+        Post.status == 'scheduled',
+        Post.published_date <= now
+    )]
+    if not due_ids:
+        db.session.commit()
+        return 0
+    
+    Post.query.filter(Post.id.in_(due_ids)).update({Post.status: 'published'}, synchronize_session=False)
+    # Listings, sidebars and cached pages depend on the set of published posts
+    mark_changed(db.session, 'posts')
+    # Queued for process_related_queue rather than computed here, as this also runs in requests
+    mark_posts_changed(db.session, due_ids)
+    db.session.commit()
+    return len(due_ids)
+
+
+def next_due_date():
+    """published_date of the next scheduled post, or None"""
+    return db.session.query(db.func.min(Post.published_date)).filter(Post.status == 'scheduled').scalar()
+
+
+class PostScheduler(PeriodicWorker):
+    """Background thread that publishes scheduled posts when they fall due
+
+    `wake()` re-checks the schedule and the related-posts queue at once,
+    e.g. after a post was saved.
+    """
+    name = 'post-scheduler'
+    description = 'publishing scheduled posts'
+    lock_name = 'scheduler'
+
+    def __init__(self, app=None):
+        super().__init__()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('SCHEDULER_POLL_INTERVAL', 60)
+        if app.config.get('SCHEDULER_ENABLED', True):
+            app.before_request(self.start)
+
+    def tick(self):
+        count = publish_due_posts()
+        if count:
+            print(f"Published {count} scheduled post(s)")
+        due = next_due_date()
+        process_related_queue()
+        if due:
+            return min(self.interval, max(1, (due - datetime.utcnow()).total_seconds()))
+        return None
+
+
+post_scheduler = PostScheduler()
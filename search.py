@@ -0,0 +1,238 @@
+"""
+Full-text search for blog posts
+
+SQLite uses an FTS5 virtual table and PostgreSQL a tsvector column with a GIN
+index. Both live in the `post_search` table, which is kept in sync from the
+Post model events and rebuilt with `flask search-reindex`. Databases without
+either feature fall back to LIKE matching.
+"""
+import re
+from sqlalchemy import event, inspect, text, Integer, Float
+from sqlalchemy.exc import OperationalError
+from models import db, Post
+from utils import strip_html
+
+SEARCH_TABLE = 'post_search'
+
+# Column weights: title matches outrank excerpt matches, which outrank body matches
+SQLITE_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Search backend per database URL: 'fts5', 'postgres' or None (LIKE fallback)
+_backends = {}
+
+
+def _detect_backend(connection):
+    """Return the search backend available on this connection"""
+    key = str(connection.engine.url)
+    if key not in _backends:
+        dialect = connection.dialect.name
+        if dialect in ('sqlite', 'postgresql') and inspect(connection).has_table(SEARCH_TABLE):
+            _backends[key] = 'fts5' if dialect == 'sqlite' else 'postgres'
+        else:
+            _backends[key] = None
+    return _backends[key]
+
+
+def _document(post):
+    """Plain-text fields indexed for a post"""
+    return {
+        'post_id': post.id,
+        'title': post.title or '',
+        'excerpt': post.excerpt or '',
+        'content': strip_html(post.content),
+    }
+
+
+def _index_rows(connection, backend, rows):
+    """Insert or replace search documents for the given rows"""
+    if not rows:
+        return
+    if backend == 'fts5':
+        connection.execute(
+            text(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = :post_id'),
+            [{'post_id': row['post_id']} for row in rows]
+        )
+        connection.execute(
+            text(f'INSERT INTO {SEARCH_TABLE} (rowid, title, excerpt, content) '
+                 'VALUES (:post_id, :title, :excerpt, :content)'),
+            rows
+        )
+    elif backend == 'postgres':
+        connection.execute(
+            text(f"""
+                INSERT INTO {SEARCH_TABLE} (post_id, document)
+                VALUES (:post_id,
+                        setweight(to_tsvector('english', :title), 'A') ||
+                        setweight(to_tsvector('english', :excerpt), 'B') ||
+                        setweight(to_tsvector('english', :content), 'C'))
+                ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document
+            """),
+            rows
+        )
+
+
+def _remove_rows(connection, backend, post_ids):
+    """Delete search documents for the given post ids"""
+    if not post_ids:
+        return
+    column = 'rowid' if backend == 'fts5' else 'post_id'
+    connection.execute(
+        text(f'DELETE FROM {SEARCH_TABLE} WHERE {column} = :post_id'),
+        [{'post_id': post_id} for post_id in post_ids]
+    )
+
+
+@event.listens_for(db.metadata, 'after_create')
+def create_search_index(target, connection, **kw):
+    """Create the search table alongside the model tables and backfill it once"""
+    dialect = connection.dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        return
+    if inspect(connection).has_table(SEARCH_TABLE):
+        return
+
+    try:
+        if dialect == 'sqlite':
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+                "title, excerpt, content, tokenize = 'porter unicode61')"
+            ))
+        else:
+            connection.execute(text(
+                f'CREATE TABLE {SEARCH_TABLE} ('
+                'post_id INTEGER PRIMARY KEY REFERENCES posts (id) ON DELETE CASCADE, '
+                'document TSVECTOR NOT NULL)'
+            ))
+            connection.execute(text(
+                f'CREATE INDEX ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)'
+            ))
+    except OperationalError as e:
+        # SQLite builds without FTS5 keep using the LIKE fallback
+        print(f"Full-text search unavailable: {e}")
+        return
+
+    _backends.pop(str(connection.engine.url), None)
+    reindex_posts(connection)
+
+
+def index_posts(connection, posts):
+    """Index posts written without the ORM, given as dicts of post_id, title, excerpt and content"""
+    backend = _detect_backend(connection)
+    if backend:
+        _index_rows(connection, backend, [
+            {
+                'post_id': post['post_id'],
+                'title': post.get('title') or '',
+                'excerpt': post.get('excerpt') or '',
+                'content': strip_html(post.get('content')),
+            }
+            for post in posts
+        ])
+
+
+@event.listens_for(Post, 'after_insert')
+def index_new_post(mapper, connection, target):
+    backend = _detect_backend(connection)
+    if backend:
+        _index_rows(connection, backend, [_document(target)])
+
+
+@event.listens_for(Post, 'after_update')
+def index_updated_post(mapper, connection, target):
+    backend = _detect_backend(connection)
+    if not backend:
+        return
+    # Views, status and date changes do not affect the indexed text
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in ('title', 'excerpt', 'content')):
+        _index_rows(connection, backend, [_document(target)])
+
+
+@event.listens_for(Post, 'after_delete')
+def unindex_deleted_post(mapper, connection, target):
+    backend = _detect_backend(connection)
+    if backend:
+        _remove_rows(connection, backend, [target.id])
+
+
+def reindex_posts(connection=None, batch_size=200):
+    """Rebuild the search index from the posts table; returns the number of posts indexed"""
+    if connection is None:
+        with db.engine.begin() as connection:
+            return reindex_posts(connection, batch_size)
+
+    backend = _detect_backend(connection)
+    if not backend:
+        return 0
+
+    connection.execute(text(f'DELETE FROM {SEARCH_TABLE}'))
+    posts = Post.__table__
+    total = 0
+    last_id = 0
+    while True:
+        batch = connection.execute(
+            posts.select()
+            .with_only_columns(posts.c.id, posts.c.title, posts.c.excerpt, posts.c.content)
+            .where(posts.c.id > last_id)
+            .order_by(posts.c.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        _index_rows(connection, backend, [
+            {
+                'post_id': row.id,
+                'title': row.title or '',
+                'excerpt': row.excerpt or '',
+                'content': strip_html(row.content),
+            }
+            for row in batch
+        ])
+        total += len(batch)
+        last_id = batch[-1].id
+    return total
+
+
+def _fts5_query(search_query):
+    """Turn free text into a safe FTS5 query: every word must match, the last as a prefix"""
+    words = re.findall(r'\w+', search_query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_posts(query, search_query):
+    """Restrict a Post query to matches for `search_query`, ordered by relevance"""
+    backend = _detect_backend(db.session.connection())
+
+    if backend == 'fts5':
+        match = _fts5_query(search_query)
+        if match is None:
+            return query.filter(db.false())
+        ranked = text(
+            f'SELECT rowid AS post_id, bm25({SEARCH_TABLE}, {", ".join(map(str, SQLITE_WEIGHTS))}) AS rank '
+            f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match'
+        ).bindparams(match=match).columns(post_id=Integer, rank=Float).subquery()
+        # bm25() scores better matches lower
+        return query.join(ranked, ranked.c.post_id == Post.id).order_by(
+            ranked.c.rank.asc(), Post.published_date.desc()
+        )
+
+    if backend == 'postgres':
+        ranked = text(
+            f"SELECT post_id, ts_rank_cd(document, websearch_to_tsquery('english', :match)) AS rank "
+            f"FROM {SEARCH_TABLE} WHERE document @@ websearch_to_tsquery('english', :match)"
+        ).bindparams(match=search_query).columns(post_id=Integer, rank=Float).subquery()
+        return query.join(ranked, ranked.c.post_id == Post.id).order_by(
+            ranked.c.rank.desc(), Post.published_date.desc()
+        )
+
+    return query.filter(
+        db.or_(
+            Post.title.contains(search_query),
+            Post.content.contains(search_query),
+            Post.excerpt.contains(search_query)
+        )
+    ).order_by(Post.published_date.desc(), Post.created_date.desc())
@@ -0,0 +1,148 @@
+"""
+Sitemap index and child sitemaps
+
+/sitemap.xml lists one sitemap each for the fixed pages, categories, tags
+and topic pages, and one per MAX_URLS posts. Post URLs are read with
+yield_per, a server-side cursor on PostgreSQL, and written as they arrive,
+so memory stays flat however many posts there are. Finished documents are
+kept until a post, tag or category is written or a topic file changes; the
+key includes the client-supplied host, so at most MAX_CACHED are kept.
+"""
+import math
+from datetime import timezone
+from xml.sax.saxutils import XMLGenerator
+from flask import Response, abort, request, stream_with_context, url_for
+from models import db, Post, Tag, Category, post_tags
+from cache import Cache, stream_and_store
+from topics import topics, topics_version
+from utils import ChunkBuffer, xml_element
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+SITEMAP_TABLES = ('posts', 'post_tags', 'tags', 'categories')
+
+# URLs per sitemap file (the protocol's limit) and rows fetched per round trip
+MAX_URLS = 50000
+YIELD_PER = 1000
+
+# Finished documents kept in memory
+MAX_CACHED = 200
+
+_sitemaps = Cache('sitemaps', tables=SITEMAP_TABLES, max_entries=MAX_CACHED)
+
+_published = Post.status == 'published'
+
+
+def _lastmod(value):
+    return value.replace(microsecond=0, tzinfo=timezone.utc).isoformat()
+
+
+def _document(root, item, entries):
+    """Stream a <urlset> or <sitemapindex> of (loc, lastmod) entries"""
+    buffer = ChunkBuffer()
+    xml = XMLGenerator(buffer, encoding='utf-8', short_empty_elements=True)
+    xml.startDocument()
+    xml.startElement(root, {'xmlns': SITEMAP_NS})
+    yield buffer.take()
+    for count, (loc, lastmod) in enumerate(entries, start=1):
+        xml.startElement(item, {})
+        xml_element(xml, 'loc', loc)
+        if lastmod:
+            xml_element(xml, 'lastmod', _lastmod(lastmod))
+        xml.endElement(item)
+        if count % YIELD_PER == 0:
+            yield buffer.take()
+    xml.endElement(root)
+    xml.endDocument()
+    yield buffer.take()
+
+
+def _response(key, root, item, entries):
+    """Cached document for `key`, or a streamed one stored once complete"""
+    key = key + (request.host_url,)
+    document = _sitemaps.get(key)
+    if document is None:
+        document = stream_with_context(stream_and_store(_sitemaps, key, _document(root, item, entries)))
+    return Response(document, mimetype='application/xml')
+
+
+def _post_chunks():
+    """Number of post sitemaps"""
+    count = db.session.query(db.func.count(Post.id)).filter(_published).scalar()
+    return max(1, math.ceil(count / MAX_URLS))
+
+
+def _post_rows(number):
+    return (db.session.query(Post.slug, Post.updated_date)
+            .filter(_published)
+            .order_by(Post.id)
+            .offset((number - 1) * MAX_URLS)
+            .limit(MAX_URLS)
+            .yield_per(YIELD_PER))
+
+
+def _newest_post():
+    return db.session.query(db.func.max(Post.updated_date)).filter(_published).scalar()
+
+
+def sitemap_index():
+    """The sitemap index, with each child's newest change as lastmod"""
+    def entries():
+        newest = _newest_post()
+        for name in ('pages', 'categories', 'tags'):
+            yield url_for('sitemap', name=name, _external=True), newest
+        yield url_for('sitemap', name='topics', _external=True), topics_version()[1]
+        for number in range(1, _post_chunks() + 1):
+            chunk = _post_rows(number).subquery()
+            lastmod = db.session.query(db.func.max(chunk.c.updated_date)).scalar()
+            yield url_for('post_sitemap', number=number, _external=True), lastmod
+
+    return _response(('index', topics_version()[0]), 'sitemapindex', 'sitemap', entries())
+
+
+def post_sitemap(number):
+    """The `number`th sitemap of published posts, oldest first"""
+    if number < 1 or number > _post_chunks():
+        abort(404)
+
+    def entries():
+        for slug, updated in _post_rows(number):
+            yield url_for('blog_detail', slug=slug, _external=True), updated
+
+    return _response(('posts', number), 'urlset', 'url', entries())
+
+
+def named_sitemap(name):
+    """The 'pages', 'categories', 'tags' or 'topics' sitemap"""
+    if name == 'pages':
+        def entries():
+            newest = _newest_post()
+            yield url_for('index', _external=True), None
+            yield url_for('resume', _external=True), None
+            yield url_for('blog_list', _external=True), newest
+    elif name == 'categories':
+        def entries():
+            rows = (db.session.query(Category.slug, db.func.max(Post.updated_date))
+                    .outerjoin(Post, db.and_(Post.category_id == Category.id, _published))
+                    .group_by(Category.id, Category.slug)
+                    .order_by(Category.id))
+            for slug, updated in rows.yield_per(YIELD_PER):
+                yield url_for('blog_category', slug=slug, _external=True), updated
+    elif name == 'tags':
+        def entries():
+            rows = (db.session.query(Tag.slug, db.func.max(Post.updated_date))
+                    .outerjoin(post_tags, post_tags.c.tag_id == Tag.id)
+                    .outerjoin(Post, db.and_(Post.id == post_tags.c.post_id, _published))
+                    .group_by(Tag.id, Tag.slug)
+                    .order_by(Tag.id))
+            for slug, updated in rows.yield_per(YIELD_PER):
+                yield url_for('blog_tag', slug=slug, _external=True), updated
+    elif name == 'topics':
+        def entries():
+            for topic in topics.all():
+                yield url_for('topic_detail', topic_slug=topic.slug, _external=True), topic.modified
+    else:
+        abort(404)
+
+    # Topic files change outside the database, so their version is part of the key
+    version = topics_version()[0] if name == 'topics' else None
+    return _response((name, version), 'urlset', 'url', entries())
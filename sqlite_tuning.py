@@ -0,0 +1,93 @@
+"""
+SQLite tuning
+
+SQLite's default rollback journal lets a writer (a post save, a view count
+flush, the scheduler) block every reader, and concurrent gunicorn workers
+then fail with "database is locked". Every new SQLite connection gets the
+SQLITE_PRAGMAS of the config instead:
+
+- busy_timeout: wait for a lock instead of failing at once;
+- journal_mode=WAL: readers keep reading while one writer writes;
+- synchronous=NORMAL: with WAL, durable except for the last commits on
+  power loss, with far fewer fsyncs;
+- cache_size, mmap_size and temp_store: more of the database and of
+  temporary sort tables kept in memory.
+
+In WAL mode writes go to a -wal file that SQLite copies back into the
+database when it grows. Every SQLITE_MAINTENANCE_INTERVAL seconds one
+worker (the holder of an instance-folder lock) also checkpoints and
+truncates it and runs PRAGMA optimize so the planner statistics stay
+current. `flask db-optimize` does the same from cron.
+"""
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from models import db
+from workers import PeriodicWorker
+
+
+class _Pragmas:
+    """PRAGMA name -> value applied to new SQLite connections, in order"""
+    values = {}
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in _Pragmas.values.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+def is_sqlite(app):
+    return make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name() == 'sqlite'
+
+
+def init_sqlite(app):
+    """Apply the config's pragmas to SQLite connections and schedule maintenance"""
+    _Pragmas.values = dict(app.config.get('SQLITE_PRAGMAS') or {})
+    sqlite_maintenance.init_app(app)
+
+
+def optimize_sqlite(engine):
+    """Checkpoint and truncate the WAL, then refresh planner statistics
+
+    Returns (busy, WAL pages, pages checkpointed) from PRAGMA wal_checkpoint;
+    busy is 1 when readers or a writer kept the checkpoint from finishing.
+    """
+    with engine.connect() as connection:
+        result = tuple(connection.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)').one())
+        connection.exec_driver_sql('PRAGMA optimize')
+    return result
+
+
+class SQLiteMaintenance(PeriodicWorker):
+    """Background thread that periodically checkpoints and optimizes the database"""
+    name = 'sqlite-maintenance'
+    description = 'SQLite maintenance'
+    lock_name = 'sqlite-maintenance'
+    wait_first = True
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.interval = 3600
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('SQLITE_MAINTENANCE_INTERVAL', 3600)
+        if self.interval and is_sqlite(app):
+            app.before_request(self.start)
+
+    def tick(self):
+        busy, _, _ = optimize_sqlite(db.engine)
+        if busy:
+            print("SQLite checkpoint could not finish: the database was busy")
+
+
+sqlite_maintenance = SQLiteMaintenance()
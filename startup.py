@@ -0,0 +1,105 @@
+"""
+One-time startup initialization
+
+Every gunicorn worker imports the app, and each used to create the tables
+and seed the database itself, all at once against the same database.
+`run_once(name, initialize)` runs `initialize` once per release (see
+conditional.release_version) however many workers start:
+
+- workers serialize on a lock: a PostgreSQL advisory lock, or an flock on
+  a file in the instance folder for SQLite;
+- the first worker through runs `initialize` and records the release in
+  the startup_runs table;
+- the others wait for the lock, see the record and go straight to serving.
+
+A failed run is not recorded, so the next worker tries again. With
+`gunicorn --preload` the master process runs it once before forking.
+"""
+import hashlib
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from flask import current_app
+from models import db
+from conditional import release_version
+from workers import FileLock
+
+startup_runs = db.Table('startup_runs',
+    db.Column('name', db.String(100), primary_key=True),
+    db.Column('release', db.String(64), nullable=False),
+    db.Column('completed_at', db.DateTime, nullable=False)
+)
+
+# (name, release) pairs finished or found finished by this process
+_done = set()
+
+
+def _advisory_key(name):
+    """Signed 64-bit advisory lock key for `name`"""
+    return int.from_bytes(hashlib.sha1(f'startup:{name}'.encode()).digest()[:8], 'big', signed=True)
+
+
+@contextmanager
+def startup_lock(name):
+    """Hold the cross-process lock for `name`, waiting for other holders"""
+    if db.engine.dialect.name == 'postgresql':
+        key = _advisory_key(name)
+        with db.engine.connect() as connection:
+            if not connection.execute(db.text('SELECT pg_try_advisory_lock(:key)'), {'key': key}).scalar():
+                print(f"Waiting for another worker to finish {name}...")
+                connection.execute(db.text('SELECT pg_advisory_lock(:key)'), {'key': key})
+            # Behind a transaction-mode pgbouncer only an open transaction keeps
+            # this server connection, and with it the lock, until the unlock
+            if not current_app.config.get('DB_PGBOUNCER'):
+                connection.commit()
+            try:
+                yield
+            finally:
+                connection.execute(db.text('SELECT pg_advisory_unlock(:key)'), {'key': key})
+                connection.commit()
+    else:
+        # Without fcntl (Windows) the lock is a no-op; the record still prevents reruns
+        lock = FileLock(os.path.join(current_app.instance_path, f'{name}.lock'))
+        if not lock.acquire():
+            print(f"Waiting for another worker to finish {name}...")
+            lock.acquire(wait=True)
+        try:
+            yield
+        finally:
+            lock.release()
+
+
+def completed_release(name):
+    """Release `name` last completed for, or None"""
+    with db.engine.begin() as connection:
+        startup_runs.create(connection, checkfirst=True)
+        return connection.execute(
+            db.select(startup_runs.c.release).where(startup_runs.c.name == name)
+        ).scalar()
+
+
+def _record(name, release):
+    with db.engine.begin() as connection:
+        connection.execute(startup_runs.delete().where(startup_runs.c.name == name))
+        connection.execute(startup_runs.insert().values(
+            name=name, release=release, completed_at=datetime.utcnow()
+        ))
+
+
+def run_once(name, initialize):
+    """Run `initialize` unless it already ran for this release; returns whether it ran"""
+    release = release_version()
+    if (name, release) in _done:
+        return False
+    with startup_lock(name):
+        if completed_release(name) == release:
+            print(f"Skipping {name}: already done for this release")
+            ran = False
+        else:
+            initialize()
+            _record(name, release)
+            ran = True
+    _done.add((name, release))
+    # Connections opened here must not be shared with workers forked after --preload
+    db.engine.dispose()
+    return ran
@@ -0,0 +1,60 @@
+"""
+Cached blog taxonomy for the listing sidebar
+
+Categories and tags are loaded together with their published-post counts
+(one GROUP BY each) into an immutable snapshot that is kept in memory until
+a post, tag or category is written.
+"""
+from collections import namedtuple
+from models import db, Category, Tag, Post, post_tags
+from cache import Cache
+
+CategoryEntry = namedtuple('CategoryEntry', 'id name slug post_count')
+TagEntry = namedtuple('TagEntry', 'id name slug post_count weight')
+Taxonomy = namedtuple('Taxonomy', 'categories tags')
+
+# Number of font-size steps in the tag cloud
+TAG_WEIGHTS = 5
+
+_taxonomy_cache = Cache('taxonomy', tables=('posts', 'post_tags', 'tags', 'categories'))
+
+
+def _tag_weight(count, lowest, highest):
+    """Scale a tag's post count to 1..TAG_WEIGHTS"""
+    if highest == lowest:
+        return 1
+    return 1 + round((TAG_WEIGHTS - 1) * (count - lowest) / (highest - lowest))
+
+
+def _build_taxonomy():
+    published = Post.status == 'published'
+
+    category_rows = (
+        db.session.query(Category.id, Category.name, Category.slug, db.func.count(Post.id))
+        .outerjoin(Post, db.and_(Post.category_id == Category.id, published))
+        .group_by(Category.id, Category.name, Category.slug)
+        .order_by(Category.id)
+        .all()
+    )
+
+    tag_rows = (
+        db.session.query(Tag.id, Tag.name, Tag.slug, db.func.count(Post.id))
+        .outerjoin(post_tags, post_tags.c.tag_id == Tag.id)
+        .outerjoin(Post, db.and_(Post.id == post_tags.c.post_id, published))
+        .group_by(Tag.id, Tag.name, Tag.slug)
+        .order_by(Tag.id)
+        .all()
+    )
+
+    counts = [row[3] for row in tag_rows]
+    lowest, highest = (min(counts), max(counts)) if counts else (0, 0)
+
+    return Taxonomy(
+        categories=tuple(CategoryEntry(*row) for row in category_rows),
+        tags=tuple(TagEntry(*row, weight=_tag_weight(row[3], lowest, highest)) for row in tag_rows),
+    )
+
+
+def get_taxonomy():
+    """Categories and tags with published-post counts, cached until they change"""
+    return _taxonomy_cache.get_or_set('taxonomy', _build_taxonomy)
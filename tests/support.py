@@ -0,0 +1,33 @@
+"""Shared setup for tests that use the full application
+
+The app runs with TestingConfig against a scratch instance folder, so the
+tests never touch instance/ of the working tree. The database is seeded
+with the portfolio data once per test run.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INSTANCE = tempfile.mkdtemp(prefix='portfolio-tests-')
+atexit.register(shutil.rmtree, INSTANCE, True)
+os.environ['FLASK_ENV'] = 'testing'
+os.environ['INSTANCE_PATH'] = INSTANCE
+
+from app import app, setup_database  # noqa: E402
+
+
+class _Seeded:
+    done = False
+
+
+def seeded_app():
+    """The application, with its database created and seeded"""
+    if not _Seeded.done:
+        with app.app_context():
+            setup_database()
+        _Seeded.done = True
+    return app
@@ -0,0 +1,47 @@
+"""Cached post pages and the ?prev= continuation link"""
+import unittest
+
+from support import seeded_app
+from models import db, Post
+
+
+class PrevLinkCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = seeded_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            published = Post.query.filter_by(status='published', previous_post_id=None).order_by(Post.id).limit(2).all()
+            self.post, self.other = (post.slug for post in published)
+            # A continuation of a post that is not published: the page has no previous link of its own
+            draft = Post(title='Unpublished part one', slug='unpublished-part-one', content='<p>draft</p>',
+                         author_id=published[0].author_id, status='draft')
+            db.session.add(draft)
+            db.session.flush()
+            published[0].previous_post_id = draft.id
+            db.session.commit()
+            self.draft_id = draft.id
+
+    def tearDown(self):
+        with self.app.app_context():
+            Post.query.filter_by(slug=self.post).one().previous_post_id = None
+            db.session.delete(db.session.get(Post, self.draft_id))
+            db.session.commit()
+
+    def page(self, url):
+        return self.client.get(url).get_data(as_text=True)
+
+    def test_prev_link_is_not_cached_for_the_plain_page(self):
+        link = f'<a href="/blog/{self.other}" class="btn-back-top">'
+        self.assertIn(link, self.page(f'/blog/{self.post}?prev={self.other}'))
+        self.assertNotIn('Continue from:', self.page(f'/blog/{self.post}'))
+        # Still served from its own entry
+        self.assertIn(link, self.page(f'/blog/{self.post}?prev={self.other}'))
+
+    def test_unknown_prev_shares_the_plain_page(self):
+        self.assertNotIn('Continue from:', self.page(f'/blog/{self.post}?prev=no-such-post'))
+        self.assertNotIn('Continue from:', self.page(f'/blog/{self.post}'))
+
+
+if __name__ == '__main__':
+    unittest.main()
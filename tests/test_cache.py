@@ -0,0 +1,40 @@
+"""In-process caches and invalidation during a computation"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import Cache, invalidate, _caches
+
+
+class GetOrSetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = Cache('test', tables=('widgets',))
+
+    def tearDown(self):
+        _caches.remove(self.cache)
+
+    def test_stores_computed_value(self):
+        self.assertEqual(self.cache.get_or_set('key', lambda: 'fresh'), 'fresh')
+        self.assertEqual(self.cache.get('key'), 'fresh')
+
+    def test_invalidation_during_computation_is_not_overwritten(self):
+        def creator():
+            # A commit to the cache's table lands while the value is computed
+            invalidate('widgets')
+            return 'stale'
+        self.assertEqual(self.cache.get_or_set('key', creator), 'stale')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_other_tables_do_not_matter(self):
+        def creator():
+            invalidate('gadgets')
+            return 'fresh'
+        self.cache.get_or_set('key', creator)
+        self.assertEqual(self.cache.get('key'), 'fresh')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+"""Feeds: streamed documents give their database connection back"""
+import unittest
+
+from support import seeded_app
+from models import db
+import feeds
+
+
+class FeedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = seeded_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.pool = db.engine.pool
+        feeds._feeds.clear()
+
+    def test_streamed_feed_returns_its_connection(self):
+        # A new host misses the cache, so each feed is generated and streamed
+        for host in ('a.example', 'b.example', 'c.example'):
+            response = self.client.get('/feed.xml', base_url=f'http://{host}')
+            body = response.get_data()
+            response.close()
+            self.assertIn(b'<rss', body)
+            self.assertIn(f'http://{host}/blog/'.encode(), body)
+            self.assertEqual(self.pool.checkedout(), 0)
+
+    def test_cache_is_bounded(self):
+        for number in range(feeds.MAX_CACHED):
+            self.client.get('/atom.xml', base_url=f'http://host{number}.example').close()
+        self.assertLessEqual(len(feeds._feeds), feeds.MAX_CACHED)
+
+
+if __name__ == '__main__':
+    unittest.main()
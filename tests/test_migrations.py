@@ -0,0 +1,70 @@
+"""Schema migrations on a database created before the derived post columns existed"""
+import os
+import sys
+import tempfile
+import unittest
+from flask import Flask
+from sqlalchemy import inspect, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db
+from content import DERIVED_COLUMNS
+from migrations import migrate, downgrade, migration_status
+
+
+def create_app(instance_path):
+    app = Flask(__name__, instance_path=instance_path)
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite:///site.db')
+    db.init_app(app)
+    return app
+
+
+class BaselineUpgradeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.instance = tempfile.TemporaryDirectory()
+        self.app = create_app(self.instance.name)
+        self.context = self.app.app_context()
+        self.context.push()
+        # Baseline schema: only 0001 applied, no derived columns or hot-query indexes
+        migrate()
+        downgrade('0001')
+        with db.engine.begin() as connection:
+            connection.execute(text("INSERT INTO users (username, email, password_hash, is_admin) "
+                                    "VALUES ('admin', 'admin@example.com', 'x', 1)"))
+            connection.execute(text("INSERT INTO posts (title, slug, author_id, content, status) "
+                                    "VALUES ('Hello', 'hello', 1, '<p>one two three</p>', 'published')"))
+
+    def tearDown(self):
+        db.engine.dispose()
+        self.context.pop()
+        self.instance.cleanup()
+
+    def columns(self):
+        return {column['name'] for column in inspect(db.engine).get_columns('posts')}
+
+    def applied(self):
+        return [version for version, _, applied_at in migration_status() if applied_at]
+
+    def test_baseline(self):
+        self.assertEqual(self.applied(), ['0001'])
+        self.assertFalse(self.columns() & DERIVED_COLUMNS.keys())
+
+    def test_create_all_applies_migrations_before_online_ones(self):
+        # Paths that only call create_all still get the columns the models read
+        db.create_all()
+        self.assertLessEqual(DERIVED_COLUMNS.keys(), self.columns())
+        self.assertEqual(self.applied(), ['0001', '0003'])
+
+    def test_migrate_applies_everything(self):
+        self.assertEqual(migrate(), ['0002', '0003', '0004'])
+        self.assertEqual(self.applied(), ['0001', '0002', '0003', '0004'])
+        self.assertIn('ix_posts_published', {index['name'] for index in inspect(db.engine).get_indexes('posts')})
+        with db.engine.connect() as connection:
+            self.assertEqual(connection.execute(text("SELECT word_count FROM posts")).scalar(), 3)
+        self.assertEqual(migrate(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
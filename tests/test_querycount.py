@@ -0,0 +1,39 @@
+"""N+1 guard: the blog listing runs the same queries whatever the page size"""
+import unittest
+
+from support import seeded_app
+from cache import invalidate
+from querycount import count_queries, assert_max_queries
+
+
+class BlogListQueriesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = seeded_app()
+        self.client = self.app.test_client()
+        self.per_page = self.app.config['POSTS_PER_PAGE']
+
+    def tearDown(self):
+        self.app.config['POSTS_PER_PAGE'] = self.per_page
+
+    def render(self, per_page, limit=None):
+        """Render /blog with `per_page` cards from cold caches; returns (cards, statements)"""
+        self.app.config['POSTS_PER_PAGE'] = per_page
+        invalidate()
+        with self.app.app_context():
+            counter = count_queries() if limit is None else assert_max_queries(limit)
+            with counter as statements:
+                response = self.client.get('/blog')
+        self.assertEqual(response.status_code, 200)
+        return response.get_data(as_text=True).count('<article class="post-card">'), len(statements)
+
+    def test_query_count_does_not_grow_with_posts(self):
+        cards, queries = self.render(2)
+        self.assertEqual(cards, 2)
+        # Six times the cards, not one more query
+        cards, _ = self.render(12, limit=queries)
+        self.assertEqual(cards, 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
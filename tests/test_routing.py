@@ -0,0 +1,82 @@
+"""Read-replica routing: public GETs read from the replica, writes go to the primary"""
+import os
+import sys
+import tempfile
+import unittest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db, Tag
+from routing import init_routing
+from cache import init_cache
+
+
+def create_app(instance_path):
+    app = Flask(__name__, instance_path=instance_path)
+    app.config.update(
+        SECRET_KEY='test',
+        # Relative SQLite paths resolve against the instance folder, as documented
+        SQLALCHEMY_DATABASE_URI='sqlite:///primary.db',
+        DATABASE_REPLICA_URLS=['sqlite:///replica.db'],
+        READ_REPLICA_ENDPOINTS=['tag_names'],
+        READ_YOUR_WRITES_WINDOW=5,
+    )
+    init_routing(app)
+    db.init_app(app)
+    init_cache(app)
+
+    @app.route('/tags')
+    def tag_names():
+        return ','.join(tag.name for tag in Tag.query.order_by(Tag.name))
+
+    @app.route('/tags', methods=['POST'])
+    def add_tag():
+        db.session.add(Tag(name='written', slug='written'))
+        db.session.commit()
+        return 'ok'
+
+    return app
+
+
+class RoutingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.instance = tempfile.TemporaryDirectory()
+        self.app = create_app(self.instance.name)
+        with self.app.app_context():
+            # Same schema on both, different rows, so each response shows which one was read
+            for key, name in ((None, 'primary'), ('replica-1', 'replica')):
+                engine = db.engines[key]
+                Tag.__table__.create(engine)
+                with engine.begin() as connection:
+                    connection.execute(Tag.__table__.insert().values(name=name, slug=name))
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        with self.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        self.instance.cleanup()
+
+    def tag_names(self, key):
+        with self.app.app_context(), db.engines[key].connect() as connection:
+            return sorted(connection.execute(db.select(Tag.name)).scalars())
+
+    def test_replica_bind_is_added(self):
+        self.assertIn('replica-1', self.app.config['SQLALCHEMY_BINDS'])
+        self.assertTrue(os.path.exists(os.path.join(self.instance.name, 'replica.db')))
+
+    def test_public_get_reads_from_replica(self):
+        self.assertEqual(self.client.get('/tags').get_data(as_text=True), 'replica')
+
+    def test_write_goes_to_primary(self):
+        self.assertEqual(self.client.post('/tags').status_code, 200)
+        self.assertEqual(self.tag_names(None), ['primary', 'written'])
+        self.assertEqual(self.tag_names('replica-1'), ['replica'])
+        # Reads stay on the primary until the replica has had time to catch up
+        self.assertEqual(self.client.get('/tags').get_data(as_text=True), 'primary,written')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Python topic pages
+
+Each topic is a file topics/<slug>.html: a header of `key: value` lines
+between `---` markers (title, category, optional image, order) followed by
+the HTML body. The files are parsed, with code blocks highlighted, on first
+use into a module-level registry, so serving a topic is a dict lookup. The
+folder is rescanned at most every RELOAD_INTERVAL seconds and only files
+whose mtime changed are read again, so edited, added or removed topics show
+up without a restart.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from markupsafe import Markup
+from highlight import highlight_html
+
+TOPICS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'topics')
+
+# Seconds between checks of the folder for changed files
+RELOAD_INTERVAL = 2
+
+Topic = namedtuple('Topic', 'slug title category image content order modified')
+
+
+def parse_topic(slug, text, modified=None):
+    """Build a Topic from a file's text"""
+    meta = {}
+    body = text
+    if text.startswith('---\n'):
+        header, _, body = text[4:].partition('\n---\n')
+        for line in header.splitlines():
+            key, _, value = line.partition(':')
+            meta[key.strip()] = value.strip()
+    return Topic(
+        slug=slug,
+        title=meta.get('title', ''),
+        category=meta.get('category', ''),
+        image=meta.get('image') or None,
+        content=Markup(highlight_html(body.strip('\n'))),
+        order=int(meta.get('order', 0)),
+        modified=modified,
+    )
+
+
+class TopicRegistry:
+    """Topics parsed from a folder, reloaded when its files change"""
+
+    def __init__(self, folder, interval=RELOAD_INTERVAL):
+        self.folder = folder
+        self.interval = interval
+        self.version = None
+        self.modified = None
+        self._topics = {}
+        self._mtimes = {}
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        """{slug: mtime_ns} of the topic files"""
+        if not os.path.isdir(self.folder):
+            return {}
+        return {entry.name[:-5]: entry.stat().st_mtime_ns
+                for entry in os.scandir(self.folder)
+                if entry.name.endswith('.html') and entry.is_file()}
+
+    def _read(self, slug, mtime):
+        with open(os.path.join(self.folder, f'{slug}.html'), encoding='utf-8') as f:
+            text = f.read()
+        return parse_topic(slug, text, datetime.fromtimestamp(mtime / 1e9, timezone.utc))
+
+    def refresh(self, force=False):
+        """Re-read changed files if the folder is due for a check"""
+        now = time.monotonic()
+        if not force and self._checked is not None and now - self._checked < self.interval:
+            return
+        with self._lock:
+            if not force and self._checked is not None and now - self._checked < self.interval:
+                return
+            mtimes = self._scan()
+            if mtimes != self._mtimes:
+                topics = {}
+                for slug, mtime in mtimes.items():
+                    topic = self._topics.get(slug)
+                    if topic is None or self._mtimes.get(slug) != mtime:
+                        topic = self._read(slug, mtime)
+                    topics[slug] = topic
+                self._topics = dict(sorted(topics.items(), key=lambda item: (item[1].order, item[0])))
+                self._mtimes = mtimes
+                self.version = hashlib.sha1(repr(sorted(mtimes.items())).encode()).hexdigest()
+                self.modified = max((t.modified for t in topics.values()), default=None)
+            self._checked = now
+
+    def get(self, slug):
+        self.refresh()
+        return self._topics.get(slug)
+
+    def all(self):
+        """Topics in display order"""
+        self.refresh()
+        return list(self._topics.values())
+
+
+topics = TopicRegistry(TOPICS_FOLDER)
+
+
+def get_topic(slug):
+    """The Topic for `slug`, or None"""
+    return topics.get(slug)
+
+
+def topic_slugs():
+    """Slugs of all topics in display order"""
+    return [topic.slug for topic in topics.all()]
+
+
+def topics_version():
+    """(fingerprint, newest modification time) of the topic files"""
+    topics.refresh()
+    return topics.version, topics.modified
@@ -1,4 +1,7 @@
+import io
 import os
+import re
+from html import unescape
 from werkzeug.utils import secure_filename
 from flask import current_app
 from PIL import Image
@@ -94,3 +97,29 @@ def get_video_embed_url(url):
     
     return url
 
+
+def strip_html(html):
+    """Convert an HTML fragment to whitespace-normalised plain text"""
+    if not html:
+        return ''
+    text = re.sub(r'<(script|style)\b.*?</\1>', ' ', html, flags=re.IGNORECASE | re.DOTALL)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    return ' '.join(unescape(text).split())
+
+
+class ChunkBuffer(io.StringIO):
+    """Text buffer emptied each time its contents are taken, for streaming XMLGenerator output"""
+
+    def take(self):
+        data = self.getvalue()
+        self.seek(0)
+        self.truncate()
+        return data
+
+
+def xml_element(xml, name, text=None, attrs=None):
+    """Write a complete element with optional text to an XMLGenerator"""
+    xml.startElement(name, attrs or {})
+    if text:
+        xml.characters(text)
+    xml.endElement(name)
@@ -0,0 +1,146 @@
+"""
+Write-behind view counting
+
+Page views are tallied in memory per worker. A background thread adds the
+tallies to post_view_counts in one batched upsert every VIEW_FLUSH_INTERVAL
+seconds, and once more when the worker exits, so read traffic never writes
+to the posts table.
+"""
+import atexit
+import threading
+from collections import Counter
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Post, PostViewCount
+from workers import PeriodicWorker
+
+
+def _upsert_views(connection, increments):
+    """Add `increments` ({post_id: views}) to the counter table in one statement per kind"""
+    table = PostViewCount.__table__
+    rows = [{'post_id': post_id, 'views': views} for post_id, views in increments.items()]
+    dialect = connection.dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.post_id],
+            set_={'views': table.c.views + stmt.excluded.views}
+        )
+        connection.execute(stmt, rows)
+        return
+
+    existing = set(connection.execute(
+        db.select(table.c.post_id).where(table.c.post_id.in_(increments))
+    ).scalars())
+    updates = [{'pid': row['post_id'], 'delta': row['views']} for row in rows if row['post_id'] in existing]
+    inserts = [row for row in rows if row['post_id'] not in existing]
+    if updates:
+        connection.execute(
+            table.update()
+            .where(table.c.post_id == db.bindparam('pid'))
+            .values(views=table.c.views + db.bindparam('delta')),
+            updates
+        )
+    if inserts:
+        connection.execute(table.insert(), inserts)
+
+
+class ViewCounter(PeriodicWorker):
+    """Buffers view increments in memory and flushes them in batches"""
+    name = 'view-counter'
+    description = 'flushing view counts'
+    wait_first = True
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.interval = 10
+        # Off for renders that are not page views (static export)
+        self.counting = True
+        self._pending = Counter()
+        self._inflight = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('VIEW_FLUSH_INTERVAL', 10)
+        atexit.register(self.flush)
+
+    def forked(self):
+        # Counts inherited from the parent process are the parent's to flush
+        with self._lock:
+            self._pending.clear()
+            self._totals.clear()
+
+    def tick(self):
+        self.flush()
+
+    def record(self, post_id):
+        """Count one view of a post and return its current total"""
+        if not self.counting:
+            return self.total(post_id)
+        self.start()
+        with self._lock:
+            self._pending[post_id] += 1
+        return self.total(post_id)
+
+    def total(self, post_id):
+        """Persisted views plus views not yet flushed by this worker"""
+        base = self._totals.get(post_id)
+        if base is None:
+            base = db.session.query(PostViewCount.views).filter_by(post_id=post_id).scalar() or 0
+            self._totals[post_id] = base
+        return base + self._inflight.get(post_id, 0) + self._pending[post_id]
+
+    def set_total(self, post_id, views):
+        """Overwrite a post's count (admin edits), discarding unflushed views"""
+        with self._lock:
+            self._pending.pop(post_id, None)
+            self._totals[post_id] = views
+        counter = db.session.get(PostViewCount, post_id)
+        if counter is None:
+            db.session.add(PostViewCount(post_id=post_id, views=views))
+        else:
+            counter.views = views
+
+    def flush(self):
+        """Write buffered increments to the database; returns the number of posts updated"""
+        if self.app is None:
+            return 0
+        with self._lock:
+            increments = self._inflight = dict(self._pending)
+            self._pending.clear()
+        if not increments:
+            return 0
+
+        totals = {}
+        try:
+            with self.app.app_context(), db.engine.begin() as connection:
+                # Views of posts deleted since they were counted are dropped
+                live = set(connection.execute(
+                    db.select(Post.id).where(Post.id.in_(increments))
+                ).scalars())
+                increments = {post_id: views for post_id, views in increments.items() if post_id in live}
+                if increments:
+                    _upsert_views(connection, increments)
+                    table = PostViewCount.__table__
+                    totals = dict(connection.execute(
+                        db.select(table.c.post_id, table.c.views).where(table.c.post_id.in_(increments))
+                    ).all())
+        except Exception:
+            # Keep the views for the next attempt
+            with self._lock:
+                self._pending.update(self._inflight)
+                self._inflight = {}
+            raise
+
+        with self._lock:
+            self._totals.update(totals)
+            self._inflight = {}
+        return len(increments)
+
+
+view_counter = ViewCounter()
@@ -0,0 +1,111 @@
+"""
+Background threads and cross-process file locks
+
+`PeriodicWorker` is the base of the app's background threads (post
+scheduler, SQLite maintenance, view counter). The thread is started lazily,
+from the first request or call that needs it, so each forked gunicorn
+worker gets its own; a worker with a `lock_name` only does its work in the
+one process holding instance/<lock_name>.lock. `FileLock` is that lock, also
+used by startup.py to serialize startup on SQLite.
+"""
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, so every process acts as the holder
+    fcntl = None
+
+
+class FileLock:
+    """Exclusive flock on a file, held until released or the process exits"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self, wait=False):
+        """Take the lock, waiting for other holders if `wait`; returns whether it is held"""
+        if fcntl is None or self._file is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        lock_file = open(self.path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class PeriodicWorker:
+    """Daemon thread that calls `tick()` every `interval` seconds"""
+
+    # Thread name and the name used in error messages
+    name = 'worker'
+    description = 'background work'
+    # Only the process holding instance/<lock_name>.lock ticks; None for every process
+    lock_name = None
+    # Wait one interval before the first tick
+    wait_first = False
+
+    def __init__(self):
+        self.app = None
+        self.interval = 60
+        self._pid = None
+        self._lock_file = None
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+
+    def tick(self):
+        """One round of work, in an app context; returns seconds until the next, or None for `interval`"""
+        raise NotImplementedError
+
+    def forked(self):
+        """Reset per-process state; called in a new process before its thread starts"""
+
+    def start(self):
+        # Started lazily so each forked gunicorn worker gets its own thread
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.forked()
+            threading.Thread(target=self._run, name=self.name, daemon=True).start()
+
+    def wake(self):
+        """Run the next tick now"""
+        self._wake.set()
+
+    def _acquire(self):
+        if self.lock_name is None:
+            return True
+        if self._lock_file is None:
+            self._lock_file = FileLock(os.path.join(self.app.instance_path, f'{self.lock_name}.lock'))
+        return self._lock_file.acquire()
+
+    def _sleep(self, seconds):
+        self._wake.wait(seconds)
+        self._wake.clear()
+
+    def _run(self):
+        if self.wait_first:
+            self._sleep(self.interval)
+        while True:
+            delay = None
+            try:
+                if self._acquire():
+                    with self.app.app_context():
+                        delay = self.tick()
+            except Exception as e:
+                print(f"Error in {self.description}: {e}")
+            self._sleep(self.interval if delay is None else delay)